@@ -0,0 +1,105 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, current_app, request
+
+
+class Admission:
+    """Concurrency limits and per-IP rate limits for expensive views.
+
+    limit(name) lets at most CONCURRENCY_LIMITS[name]['slots'] requests run
+    the view at once; others wait up to 'timeout' seconds for a slot, then
+    get a 503 with Retry-After. rate_limit(name) gives each client IP a token
+    bucket from RATE_LIMITS[name] and answers 429 when it is empty; pass
+    `key` to split buckets further, e.g. per account. Behind a proxy, set
+    PROXY_FIX so the client IP is the one the proxy saw, not the proxy's.
+
+    Both count per worker process, so they only bite with threaded workers
+    (gunicorn --threads); with sync workers size them per worker.
+    """
+
+    MAX_CLIENTS = 10_000  # buckets kept per limit before the oldest are dropped
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._slots = {}
+        self._buckets = {}
+
+    def init_app(self, app):
+        app.config.setdefault('ADMISSION_ENABLED', True)
+        app.config.setdefault('CONCURRENCY_LIMITS', {})
+        app.config.setdefault('RATE_LIMITS', {})
+        app.extensions['admission'] = self
+
+    def _semaphore(self, name, slots):
+        with self._lock:
+            if name not in self._slots:
+                self._slots[name] = threading.BoundedSemaphore(slots)
+            return self._slots[name]
+
+    def limit(self, name, methods=None):
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                config = current_app.config
+                settings = config['CONCURRENCY_LIMITS'].get(name)
+                if (not config['ADMISSION_ENABLED'] or not settings
+                        or (methods and request.method not in methods)):
+                    return view(*args, **kwargs)
+
+                slots = self._semaphore(name, settings['slots'])
+                if not slots.acquire(timeout=settings.get('timeout', 0)):
+                    retry_after = settings.get('retry_after', max(1, math.ceil(settings.get('timeout', 1))))
+                    current_app.logger.warning("Shedding %s request: all %s slots busy", name, settings['slots'])
+                    return Response("The server is busy, please try again shortly.", status=503,
+                                    headers={"Retry-After": str(retry_after)})
+                try:
+                    response = current_app.make_response(view(*args, **kwargs))
+                except BaseException:
+                    slots.release()
+                    raise
+                if response.is_streamed:
+                    # The work happens as the body is sent; hold the slot until then
+                    response.call_on_close(slots.release)
+                else:
+                    slots.release()
+                return response
+            return wrapper
+        return decorator
+
+    def _take(self, name, client, burst, rate):
+        # Returns 0 if a token was taken, else seconds until the next one
+        now = time.monotonic()
+        with self._lock:
+            buckets = self._buckets.setdefault(name, OrderedDict())
+            tokens, last = buckets.pop(client, (burst, now))
+            tokens = min(burst, tokens + (now - last) * rate)
+            wait = 0 if tokens >= 1 else (1 - tokens) / rate
+            buckets[client] = (tokens - 1 if not wait else tokens, now)
+            if len(buckets) > self.MAX_CLIENTS:
+                buckets.popitem(last=False)
+        return wait
+
+    def rate_limit(self, name, methods=('POST',), key=None):
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                config = current_app.config
+                settings = config['RATE_LIMITS'].get(name)
+                if not config['ADMISSION_ENABLED'] or not settings or request.method not in methods:
+                    return view(*args, **kwargs)
+
+                client = (request.remote_addr, key()) if key else request.remote_addr
+                wait = self._take(name, client, settings['burst'], settings['per_second'])
+                if wait:
+                    return Response("Too many requests, please slow down.", status=429,
+                                    headers={"Retry-After": str(math.ceil(wait))})
+                return view(*args, **kwargs)
+            return wrapper
+        return decorator
+
+
+admission = Admission()
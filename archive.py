@@ -0,0 +1,169 @@
+import os
+from datetime import date
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import column, table, text
+
+from extensions import db
+from models import Attendance
+
+ARCHIVE_SCHEMA = 'archive'
+COLUMNS = 'id, student_id, teacher_id, date, status'
+# The live row is the archived one, not a later row that reused its id
+SAME_ROW = "{live}.id = archived.id AND {live}.student_id IS archived.student_id AND {live}.date = archived.date"
+
+# Same shape as Attendance; reports select from this instead of the model
+attendance_all = table(
+    'attendance_all',
+    column('id', db.Integer),
+    column('student_id', db.Integer),
+    column('teacher_id', db.Integer),
+    column('date', db.Date),
+    column('status', db.String),
+)
+
+
+def archive_path():
+    return current_app.config['ATTENDANCE_ARCHIVE_PATH']
+
+
+def attach_archive(conn):
+    """ATTACH the archive database to this connection, once per connection.
+
+    Returns False when no archive has been written yet. Must run before the
+    connection starts a write transaction.
+    """
+    path = archive_path()
+    if conn.info.get('attendance_archive') == path:
+        return True
+    if not os.path.exists(path):
+        return False
+    attached = {row[1] for row in conn.exec_driver_sql("PRAGMA database_list")}
+    if ARCHIVE_SCHEMA not in attached:
+        conn.execute(text(f"ATTACH DATABASE :path AS {ARCHIVE_SCHEMA}"), {"path": path})
+    conn.exec_driver_sql("DROP VIEW IF EXISTS temp.attendance_all")
+    conn.exec_driver_sql(
+        f"CREATE TEMP VIEW attendance_all AS "
+        f"SELECT {COLUMNS} FROM main.Attendance "
+        f"UNION ALL SELECT {COLUMNS} FROM {ARCHIVE_SCHEMA}.Attendance archived "
+        # Copied but not yet deleted from main (see archive_attendance)
+        f"WHERE NOT EXISTS (SELECT 1 FROM main.Attendance live WHERE {SAME_ROW.format(live='live')})"
+    )
+    conn.info['attendance_archive'] = path
+    return True
+
+
+def attendance_source():
+    """Attendance rows old and new: the attendance_all view when there is an
+    archive, otherwise just the Attendance table."""
+    if attach_archive(db.session.connection()):
+        return attendance_all
+    return Attendance.__table__
+
+
+def _create_archive(conn):
+    conn.exec_driver_sql(
+        f"CREATE TABLE IF NOT EXISTS {ARCHIVE_SCHEMA}.Attendance ("
+        "id INTEGER NOT NULL PRIMARY KEY, "
+        "student_id INTEGER, "
+        "teacher_id INTEGER, "
+        "date DATE NOT NULL, "
+        "status VARCHAR(10) NOT NULL)"
+    )
+    conn.exec_driver_sql(
+        f"CREATE INDEX IF NOT EXISTS {ARCHIVE_SCHEMA}.ix_attendance_student_date "
+        "ON Attendance (student_id, date)"
+    )
+
+
+def _reserve_archived_ids(conn):
+    # Attendance is AUTOINCREMENT, but a database that lost its newest rows
+    # to the archive before that could hand their ids out again
+    conn.exec_driver_sql(
+        f"UPDATE main.sqlite_sequence SET seq = MAX(seq, "
+        f"(SELECT IFNULL(MAX(id), 0) FROM {ARCHIVE_SCHEMA}.Attendance)) WHERE name = 'Attendance'"
+    )
+
+
+def archive_attendance(before, chunk_size):
+    """Move Attendance rows dated before `before` into the archive database.
+
+    Rows move in chunks. In WAL mode a transaction over two attached
+    databases is not atomic across them, so each chunk is copied in one
+    transaction and deleted from main in the next, and only rows the
+    archive already holds, with the same id, student and date, are
+    deleted. Rows keep their ids, so a run that is interrupted between the
+    two can simply be started again, and attendance_all skips archived
+    rows that are still in main meanwhile. A row whose id is already taken
+    in the archive by a different row stays in main.
+    Returns the number of rows moved.
+    """
+    path = archive_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, 'ab').close()
+
+    conn = db.session.connection()
+    attach_archive(conn)
+    _create_archive(conn)
+    _reserve_archived_ids(conn)
+    db.session.commit()
+
+    moved = kept = 0
+    last = 0
+    while True:
+        conn = db.session.connection()
+        ids = [row[0] for row in conn.execute(
+            text("SELECT id FROM main.Attendance WHERE date < :before AND id > :last ORDER BY id LIMIT :limit"),
+            {"before": before.isoformat(), "last": last, "limit": chunk_size})]
+        if not ids:
+            break
+        last = ids[-1]
+        params = {"low": ids[0], "high": ids[-1], "before": before.isoformat()}
+        conn.execute(text(
+            f"INSERT OR IGNORE INTO {ARCHIVE_SCHEMA}.Attendance ({COLUMNS}) "
+            f"SELECT {COLUMNS} FROM main.Attendance "
+            "WHERE id BETWEEN :low AND :high AND date < :before"), params)
+        db.session.commit()
+        conn = db.session.connection()
+        deleted = conn.execute(text(
+            "DELETE FROM main.Attendance AS live WHERE id BETWEEN :low AND :high AND date < :before "
+            f"AND EXISTS (SELECT 1 FROM {ARCHIVE_SCHEMA}.Attendance archived WHERE {SAME_ROW.format(live='live')})"),
+            params).rowcount
+        db.session.commit()
+        moved += deleted
+        kept += len(ids) - deleted
+    if kept:
+        current_app.logger.warning("Kept %d attendance rows whose id the archive already holds for another row",
+                                   kept)
+    return moved
+
+
+def academic_year_start(today=None):
+    today = today or date.today()
+    month = current_app.config['ACADEMIC_YEAR_START_MONTH']
+    year = today.year if today.month >= month else today.year - 1
+    return date(year, month, 1)
+
+
+@click.command("archive-attendance")
+@click.option("--before", type=click.DateTime(formats=["%Y-%m-%d"]),
+              help="Archive rows dated before this day. Defaults to the start of the current academic year.")
+@click.option("--chunk-size", default=5000, show_default=True)
+@with_appcontext
+def archive_command(before, chunk_size):
+    """Move old attendance into the archive database."""
+    before = before.date() if before else academic_year_start()
+    moved = archive_attendance(before, chunk_size)
+    if moved:
+        # Let the planner see the smaller table
+        db.session.execute(text("ANALYZE main.Attendance"))
+        db.session.commit()
+    click.echo(f"Archived {moved} attendance rows dated before {before} to {archive_path()}.")
+
+
+def init_app(app):
+    app.config.setdefault('ATTENDANCE_ARCHIVE_PATH', os.path.join(app.instance_path, 'attendance_archive.db'))
+    app.config.setdefault('ACADEMIC_YEAR_START_MONTH', 6)
+    app.cli.add_command(archive_command)
@@ -0,0 +1,155 @@
+import logging
+import time
+from datetime import datetime
+
+from sqlalchemy import text
+
+logger = logging.getLogger('alembic.backfill')
+
+CHECKPOINT_TABLE = '_backfill_checkpoint'
+TMP_PREFIX = '_alembic_tmp_'
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _tables(conn):
+    return {row[0] for row in conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def recover_alembic_tmp_tables(conn):
+    """Clean up after a batch migration that died halfway.
+
+    On SQLite, batch_alter_table copies the table into _alembic_tmp_<name>,
+    drops the original and renames the copy into place. If the original is
+    still there the copy is incomplete and is dropped. If it is gone the copy
+    already holds every row and is renamed back; its indexes are recreated
+    when the interrupted migration is run again.
+    Commits on `conn`. Returns the names of the tables that were recovered.
+    """
+    tables = _tables(conn)
+    recovered = []
+    for tmp in sorted(t for t in tables if t.startswith(TMP_PREFIX)):
+        original = tmp[len(TMP_PREFIX):]
+        if original in tables:
+            logger.warning("Dropping incomplete batch copy %s", tmp)
+            conn.exec_driver_sql(f"DROP TABLE {_quote(tmp)}")
+        else:
+            logger.warning("Restoring %s from batch copy %s", original, tmp)
+            conn.exec_driver_sql(f"ALTER TABLE {_quote(tmp)} RENAME TO {_quote(original)}")
+        recovered.append(original)
+    # Also ends the transaction the lookup began, so the caller starts clean
+    conn.commit()
+    return recovered
+
+
+def has_column(conn, table, column):
+    # Lets a data migration that is re-run after a failure skip schema
+    # steps that already went through
+    return any(row[1] == column for row in conn.exec_driver_sql(f"PRAGMA table_info({_quote(table)})"))
+
+
+def _ensure_checkpoints(conn):
+    conn.exec_driver_sql(
+        f"CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} ("
+        "name VARCHAR(100) PRIMARY KEY, "
+        "last_key INTEGER NOT NULL, "
+        "rows_done INTEGER NOT NULL, "
+        "finished_at DATETIME, "
+        "updated_at DATETIME NOT NULL)"
+    )
+
+
+def _checkpoint(conn, name):
+    return conn.execute(
+        text(f"SELECT last_key, rows_done, finished_at FROM {CHECKPOINT_TABLE} WHERE name = :name"),
+        {"name": name},
+    ).first()
+
+
+def _save_checkpoint(conn, name, last_key, rows_done, finished=False):
+    now = datetime.now()
+    conn.execute(text(
+        f"INSERT INTO {CHECKPOINT_TABLE} (name, last_key, rows_done, finished_at, updated_at) "
+        "VALUES (:name, :last_key, :rows_done, :finished_at, :now) "
+        "ON CONFLICT (name) DO UPDATE SET last_key = excluded.last_key, rows_done = excluded.rows_done, "
+        "finished_at = excluded.finished_at, updated_at = excluded.updated_at"
+    ), {"name": name, "last_key": last_key, "rows_done": rows_done,
+        "finished_at": now if finished else None, "now": now})
+
+
+def run_in_chunks(conn, name, table, process, chunk_size=1000, key='id', pause=0.05, prepare=None):
+    """Call process(conn, low, high) for consecutive key ranges of a table.
+
+    Each chunk covers at most chunk_size rows and runs in its own short
+    transaction together with the checkpoint update, so the app can keep
+    writing in between and a run that is interrupted picks up after the last
+    finished chunk. `name` identifies the backfill in the checkpoint table;
+    once it has finished, calling it again does nothing.
+
+    Slow per-row work should not hold the write lock: pass prepare(conn,
+    low, high) to do it before the chunk's transaction starts, and its
+    result is passed to process as a fourth argument.
+
+    `conn` must be in autocommit mode; from a migration use backfill() below.
+    Returns the number of rows visited.
+    """
+    _ensure_checkpoints(conn)
+    state = _checkpoint(conn, name)
+    if state and state.finished_at:
+        logger.info("Backfill %s already finished", name)
+        return 0
+    last_key, rows_done = (state.last_key, state.rows_done) if state else (None, 0)
+
+    where = f"WHERE {_quote(key)} > :last" if last_key is not None else ""
+    total = rows_done + conn.execute(
+        text(f"SELECT COUNT(*) FROM {_quote(table)} {where}"), {"last": last_key}).scalar()
+    logger.info("Backfill %s: %d of %d rows left in %s", name, total - rows_done, total, table)
+
+    started = time.monotonic()
+    done_now = 0
+    while True:
+        keys = [row[0] for row in conn.execute(
+            text(f"SELECT {_quote(key)} FROM {_quote(table)} {where} ORDER BY {_quote(key)} LIMIT :limit"),
+            {"last": last_key, "limit": chunk_size})]
+        if not keys:
+            break
+
+        prepared = (prepare(conn, keys[0], keys[-1]),) if prepare else ()
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            process(conn, keys[0], keys[-1], *prepared)
+            rows_done += len(keys)
+            last_key = keys[-1]
+            _save_checkpoint(conn, name, last_key, rows_done)
+        except BaseException:
+            conn.exec_driver_sql("ROLLBACK")
+            raise
+        conn.exec_driver_sql("COMMIT")
+
+        done_now += len(keys)
+        where = f"WHERE {_quote(key)} > :last"
+        rate = done_now / max(time.monotonic() - started, 0.001)
+        logger.info("Backfill %s: %d/%d rows (%.0f%%, %.0f rows/s)",
+                    name, rows_done, total, rows_done * 100.0 / max(total, 1), rate)
+        if len(keys) < chunk_size:
+            break
+        if pause:
+            time.sleep(pause)
+
+    _save_checkpoint(conn, name, last_key or 0, rows_done, finished=True)
+    logger.info("Backfill %s finished: %d rows", name, rows_done)
+    return done_now
+
+
+def backfill(name, table, process, chunk_size=1000, key='id', pause=0.05, prepare=None):
+    """run_in_chunks() for use inside a migration's upgrade().
+
+    The migration's own transaction is committed first, so schema changes
+    made before the backfill stay in place if it is interrupted.
+    """
+    from alembic import op
+
+    with op.get_context().autocommit_block():
+        return run_in_chunks(op.get_bind(), name, table, process, chunk_size, key, pause, prepare)
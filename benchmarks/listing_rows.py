@@ -0,0 +1,113 @@
+"""Memory and CPU of listing queries: full model objects against read_models.
+
+Fills a scratch database with --rows students, teachers and attendance
+rows, then loads each listing both ways and reads the fields its template
+shows. Time is the best of --repeat runs; memory is the peak traced while
+loading. Run from the project root:
+
+    python benchmarks/listing_rows.py --rows 10000
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import TestingConfig  # noqa: E402
+
+
+def fill(db, models, rows):
+    conn = db.session.connection()
+    conn.execute(models.Course.__table__.insert(), [{"id": 1, "name": "Course"}])
+    conn.execute(models.Parent.__table__.insert(),
+                 [{"id": i, "name": f"Parent {i}", "email": f"parent{i}@example.com", "contact": "0123456789"}
+                  for i in range(1, rows + 1)])
+    conn.execute(models.Student.__table__.insert(),
+                 [{"id": i, "name": f"Student {i}", "email": f"student{i}@example.com", "password": "x",
+                   "age": 12, "grade": "6", "course_id": 1, "parent_id": i} for i in range(1, rows + 1)])
+    conn.execute(models.Teacher.__table__.insert(),
+                 [{"id": i, "name": f"Teacher {i}", "email": f"teacher{i}@example.com", "password": "x",
+                   "qualifications": "MSc", "availability": "Weekdays", "years_of_experience": 5,
+                   "contact": "0123456789", "place": "Town", "course_id": 1} for i in range(1, rows + 1)])
+    start = date.today() - timedelta(days=rows)
+    conn.execute(models.Attendance.__table__.insert(),
+                 [{"student_id": 1, "teacher_id": 1, "date": start + timedelta(days=i), "status": "Present"}
+                  for i in range(rows)])
+    db.session.commit()
+
+
+def listings(db, models, read_models):
+    # name -> (load with model objects, load with read_models, fields the template reads)
+    Student, Teacher, Attendance = models.Student, models.Teacher, models.Attendance
+    return {
+        'students': (lambda: Student.query.all(),
+                     lambda: db.session.execute(read_models.students()).all(),
+                     lambda row: (row.id, row.name, row.email, row.age, row.grade)),
+        'teachers': (lambda: Teacher.query.all(),
+                     lambda: db.session.execute(read_models.teachers()).all(),
+                     lambda row: (row.id, row.name, row.email, row.contact, row.place)),
+        'attendance': (lambda: Attendance.query.filter_by(student_id=1).order_by(Attendance.date).all(),
+                       lambda: db.session.execute(read_models.attendance(1)).all(),
+                       lambda row: (row.date, row.status)),
+    }
+
+
+def measure(db, load, read, repeat):
+    best = None
+    for _ in range(repeat):
+        db.session.expunge_all()
+        gc.collect()
+        started = time.perf_counter()
+        for row in load():
+            read(row)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    db.session.expunge_all()
+    gc.collect()
+    tracemalloc.start()
+    rows = load()
+    for row in rows:
+        read(row)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del rows
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp(prefix='listing-bench-')
+
+    class BenchConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(folder, 'bench.db')
+        ATTENDANCE_ARCHIVE_PATH = os.path.join(folder, 'no-archive.db')
+
+    from app import create_app
+    app = create_app(BenchConfig)
+    from extensions import db
+    import models
+    import read_models
+
+    with app.app_context():
+        db.create_all()
+        fill(db, models, args.rows)
+        per = 10_000 / args.rows
+        print(f"{'listing':12} {'loader':12} {'ms/10k rows':>12} {'peak MB/10k':>12}")
+        for name, (full, projected, read) in listings(db, models, read_models).items():
+            for label, load in (('models', full), ('read_models', projected)):
+                elapsed, peak = measure(db, load, read, args.repeat)
+                print(f"{name:12} {label:12} {elapsed * 1000 * per:12.1f} {peak / 1e6 * per:12.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""Concurrent read/write throughput of SQLite with and without the app's profile.
+
+Starts writer and reader processes, like gunicorn workers marking attendance
+while others render reports, against a scratch copy of the Attendance table.
+Run from the project root:
+
+    python benchmarks/sqlite_concurrency.py --writers 4 --readers 4 --seconds 10
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlite_profile import DEFAULT_PRAGMAS  # noqa: E402
+
+STUDENTS = 2000
+
+
+def connect(path, pragmas):
+    # The driver's own default busy timeout (5 s), as the app's connections
+    # have without the profile; the tuned profile sets the same through the pragma
+    conn = sqlite3.connect(path)
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    return conn
+
+
+def setup(path, rows, pragmas):
+    conn = connect(path, pragmas)
+    conn.execute("CREATE TABLE Attendance (id INTEGER PRIMARY KEY, student_id INTEGER, "
+                 "teacher_id INTEGER, date DATE NOT NULL, status VARCHAR(10) NOT NULL)")
+    conn.execute("CREATE INDEX ix_attendance_student_date ON Attendance (student_id, date)")
+    conn.executemany(
+        "INSERT INTO Attendance (student_id, teacher_id, date, status) VALUES (?, 1, date('2024-01-01', ?), ?)",
+        ((i % STUDENTS, f"+{i // STUDENTS} days", 'Present') for i in range(rows)))
+    conn.commit()
+    conn.close()
+
+
+def writer(path, pragmas, deadline, results):
+    conn = connect(path, pragmas)
+    done = errors = 0
+    while time.time() < deadline:
+        try:
+            with conn:
+                conn.execute("INSERT INTO Attendance (student_id, teacher_id, date, status) "
+                             "VALUES (?, 1, date('now'), 'Present')", (random.randrange(STUDENTS),))
+            done += 1
+        except sqlite3.OperationalError:
+            errors += 1
+    results.put(('write', done, errors))
+
+
+def reader(path, pragmas, deadline, results):
+    conn = connect(path, pragmas)
+    done = errors = 0
+    while time.time() < deadline:
+        try:
+            conn.execute("SELECT status, COUNT(*) FROM Attendance WHERE student_id = ? GROUP BY status",
+                         (random.randrange(STUDENTS),)).fetchall()
+            # A heavier report every so often
+            if done % 50 == 0:
+                conn.execute("SELECT student_id, COUNT(*) FROM Attendance GROUP BY student_id").fetchall()
+            done += 1
+        except sqlite3.OperationalError:
+            errors += 1
+    results.put(('read', done, errors))
+
+
+def run(label, pragmas, args):
+    folder = tempfile.mkdtemp(prefix='sqlite-bench-')
+    path = os.path.join(folder, 'bench.db')
+    setup(path, args.rows, pragmas)
+
+    results = multiprocessing.Queue()
+    deadline = time.time() + args.seconds
+    procs = [multiprocessing.Process(target=writer, args=(path, pragmas, deadline, results))
+             for _ in range(args.writers)]
+    procs += [multiprocessing.Process(target=reader, args=(path, pragmas, deadline, results))
+              for _ in range(args.readers)]
+    for proc in procs:
+        proc.start()
+    totals = {'write': [0, 0], 'read': [0, 0]}
+    for _ in procs:
+        kind, done, errors = results.get(timeout=args.seconds + 60)
+        totals[kind][0] += done
+        totals[kind][1] += errors
+    for proc in procs:
+        proc.join()
+
+    for kind, (done, errors) in totals.items():
+        print(f"{label:8} {kind:5}  {done / args.seconds:10.0f} ops/s  {errors:8} locked errors")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--rows', type=int, default=200_000)
+    args = parser.parse_args()
+
+    run('default', {}, args)
+    run('tuned', DEFAULT_PRAGMAS, args)
+
+
+if __name__ == '__main__':
+    main()
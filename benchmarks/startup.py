@@ -0,0 +1,55 @@
+"""Worker startup time against a budget.
+
+Each sample runs in a fresh interpreter, like a new gunicorn worker, and
+times `import app` and `create_app()` separately. Exits with status 1 if
+the median of either goes over its budget, so it can gate CI. Run from the
+project root:
+
+    python benchmarks/startup.py --runs 5 --import-budget 0.3 --boot-budget 0.75
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE = """
+import json, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app({config!r})
+booted = time.perf_counter()
+print(json.dumps({{"import": imported - started, "boot": booted - imported}}))
+"""
+
+
+def sample(config):
+    result = subprocess.run([sys.executable, '-c', SAMPLE.format(config=config)],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--config', default='production')
+    parser.add_argument('--import-budget', type=float, default=0.3, help="seconds for `import app`")
+    parser.add_argument('--boot-budget', type=float, default=0.75, help="seconds for create_app()")
+    args = parser.parse_args()
+
+    samples = [sample(args.config) for _ in range(args.runs)]
+    over = False
+    for key, budget in (('import', args.import_budget), ('boot', args.boot_budget)):
+        median = statistics.median(s[key] for s in samples)
+        status = 'ok' if median <= budget else 'OVER BUDGET'
+        over = over or median > budget
+        print(f"{key:7} median {median * 1000:8.1f} ms  budget {budget * 1000:8.1f} ms  {status}")
+    sys.exit(1 if over else 0)
+
+
+if __name__ == '__main__':
+    main()
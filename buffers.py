@@ -0,0 +1,87 @@
+import atexit
+import threading
+
+import engagement
+from dashboards import parent_dashboards
+from extensions import db
+
+
+class WriteBehindBuffer:
+    """Collects small writes in memory and hands them to flush_fn in batches.
+
+    A background thread flushes every `interval` seconds, or sooner once
+    `size` items are waiting. Whatever is pending is flushed at exit.
+    """
+
+    def __init__(self, name, flush_fn, interval=2.0, size=500):
+        self.name = name
+        self.flush_fn = flush_fn
+        self.interval = interval
+        self.size = size
+        self.app = None
+        self._items = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def init_app(self, app, interval_key, size_key):
+        self.app = app
+        self.interval = app.config.get(interval_key, self.interval)
+        self.size = app.config.get(size_key, self.size)
+        app.extensions[self.name] = self
+        atexit.register(self.flush)
+
+    def add(self, item):
+        with self._lock:
+            self._items.append(item)
+            pending = len(self._items)
+            if self._thread is None:
+                self._start()
+        if pending >= self.size:
+            self._wake.set()
+
+    def _start(self):
+        # Started on first use so CLI commands and migrations don't spawn it
+        self._thread = threading.Thread(target=self._run, name=f"{self.name}-flusher", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                items, self._items = self._items, []
+            if not items:
+                return 0
+
+            with self.app.app_context():
+                try:
+                    self.flush_fn(items)
+                except Exception:
+                    db.session.rollback()
+                    self.app.logger.exception("Flushing %d %s items failed", len(items), self.name)
+                    # Keep them for the next round, but never let a failing
+                    # database make the buffer grow without bound
+                    with self._lock:
+                        self._items[:0] = items[:self.size * 10]
+                    return 0
+            return len(items)
+
+    def __len__(self):
+        return len(self._items)
+
+
+def flush_progress(items):
+    # items are (student_id, material_id) view events; repeated views of the
+    # same material add to one row's view count
+    counts = engagement.record_views(items)
+    db.session.commit()
+    parent_dashboards.invalidate_students(student_id for student_id, _ in counts)
+
+
+progress_buffer = WriteBehindBuffer('progress_buffer', flush_progress)
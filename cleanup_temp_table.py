@@ -1,12 +1,16 @@
-import sqlite3
+from sqlalchemy import create_engine
+
+from backfill import recover_alembic_tmp_tables
 
 # Connect to your DB
-conn = sqlite3.connect("database.db")
-cursor = conn.cursor()
+engine = create_engine("sqlite:///database.db")
 
-# Drop the leftover Alembic temp table if it exists
-cursor.execute('DROP TABLE IF EXISTS "_alembic_tmp_Student";')
+# `flask db upgrade` does this on its own; run this by hand to repair the
+# database without migrating
+with engine.connect() as conn:
+    recovered = recover_alembic_tmp_tables(conn)
 
-conn.commit()
-conn.close()
-print("Temporary Alembic table dropped successfully.")
+for name in recovered:
+    print(f"Recovered {name} from its leftover Alembic temp table.")
+if not recovered:
+    print("No leftover Alembic temp tables found.")
@@ -0,0 +1,155 @@
+import os
+
+# --- Base Directory ---
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+
+
+class Config:
+    SECRET_KEY = os.environ.get('SECRET_KEY', 'secret-key')
+
+    # --- Upload Configuration ---
+    UPLOAD_FOLDER_VIDEOS = os.path.join(BASE_DIR, 'static/uploads/videos')     # For recorded videos
+    UPLOAD_FOLDER_PHOTOS = os.path.join(BASE_DIR, 'static/photos')             # For profile photos
+    MATERIAL_FOLDER = os.path.join(BASE_DIR, 'static/uploads/materials')
+    MAX_CONTENT_LENGTH = 1 * 1024 * 1024 * 1024   # 1 GB limit for videos
+
+    # --- Signed download links for materials and recordings ---
+    DOWNLOAD_URL_PREFIX = '/files'
+    DOWNLOAD_URL_TTL = 60 * 60         # seconds a rendered link stays valid
+    DOWNLOAD_SIGNING_KEY = None        # defaults to the app secret key
+    DOWNLOAD_ACCEL_PREFIX = None       # e.g. '/protected' to hand files to nginx
+    USE_X_SENDFILE = False             # True behind Apache/lighttpd mod_xsendfile
+    PROTECT_STATIC_UPLOADS = True      # block direct /static/uploads/ access
+
+    # --- Database Configuration ---
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(BASE_DIR, 'database.db')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # SQLITE_PRAGMAS defaults to sqlite_profile.DEFAULT_PRAGMAS (WAL, busy timeout, cache sizes)
+    SQLITE_CHECKPOINT_INTERVAL = 60            # seconds between passive WAL checkpoints
+    SQLITE_WAL_TRUNCATE_BYTES = 64 * 1024 * 1024   # truncate the WAL once it gets this big
+    SQLITE_CHECK_INTERVAL = 24 * 60 * 60       # seconds between quick_checks
+
+    # --- Live updates (Server-Sent Events) ---
+    SSE_MAX_CONNECTIONS = 200   # concurrent /events streams per process
+    SSE_QUEUE_SIZE = 50         # pending events per client before it is dropped
+    SSE_HEARTBEAT_SECONDS = 15
+
+    # --- Text extraction for search ---
+    EXTRACTION_WORKERS = 2                      # worker processes
+    EXTRACTION_MAX_BYTES = 50 * 1024 * 1024     # skip bigger files
+    EXTRACTION_MAX_CHARS = 200_000              # text kept per file
+    EXTRACTION_TIME_BUDGET = 20                 # seconds per file
+
+    # --- Buffered progress writes ---
+    PROGRESS_FLUSH_INTERVAL = 2    # seconds between batched inserts
+    PROGRESS_FLUSH_SIZE = 500      # flush early once this many views are waiting
+
+    # --- Recorded class watch tracking ---
+    WATCH_HEARTBEAT_SECONDS = 10   # how often the player reports its position
+    WATCH_BUCKET_SECONDS = 10      # resolution of the watched-parts bitmap
+    WATCH_COMPLETE_PERCENT = 90    # counts as a completed view
+    WATCH_MAX_RATE = 2.0           # fastest playback speed credited between two beats
+    WATCH_ROLLUP_INTERVAL = 60     # seconds between summary rollups
+    WATCH_FLUSH_INTERVAL = 5
+    WATCH_FLUSH_SIZE = 1000
+
+    # --- Material analytics ---
+    MATERIAL_ANALYTICS_NOT_VIEWED = 20   # names listed per material; the rest are counted
+
+    # --- Orphaned upload cleanup ---
+    STORAGE_QUARANTINE_FOLDER = os.path.join(BASE_DIR, 'instance/quarantine')
+    STORAGE_QUARANTINE_DAYS = 7    # orphans are deleted after this long in quarantine
+    STORAGE_SCAN_BATCH = 500       # files checked per run
+    STORAGE_SCAN_INTERVAL = 300    # seconds between runs
+    STORAGE_MIN_AGE = 60 * 60      # leave files younger than this alone
+    STORAGE_TEACHER_QUOTA = 20 * 1024 * 1024 * 1024   # bytes per teacher, None for no limit
+    STORAGE_COURSE_QUOTA = 100 * 1024 * 1024 * 1024   # bytes per course, None for no limit
+
+    # --- Attendance archive ---
+    ATTENDANCE_ARCHIVE_PATH = os.path.join(BASE_DIR, 'instance/attendance_archive.db')
+    ACADEMIC_YEAR_START_MONTH = 6   # archive-attendance moves rows from before this month's academic year
+
+    # --- JSON API (/api/v1) ---
+    API_PAGE_SIZE = 50    # rows per page unless ?limit= asks for fewer or more
+    API_PAGE_MAX = 200
+
+    # --- Attendance scanners (POST /api/v1/attendance/batch) ---
+    ATTENDANCE_BATCH_MAX = 5000          # events per request
+    ATTENDANCE_ROSTER_TTL = 300          # seconds a course roster is cached
+    ATTENDANCE_MAX_EVENT_AGE_DAYS = 7    # older check-ins are rejected
+    ATTENDANCE_CLOCK_SKEW = 300          # seconds a scanner clock may run ahead
+
+    # --- Live class scheduling ---
+    LIVE_CLASS_DEFAULT_DURATION = 60     # minutes, prefilled on the form
+    LIVE_CLASS_MAX_DURATION = 240        # minutes; also bounds the overlap search
+    LIVE_CLASS_DAY_START = '08:00'       # next-free-slot suggestions stay inside these hours
+    LIVE_CLASS_DAY_END = '20:00'
+    LIVE_CLASS_SLOT_HORIZON_DAYS = 60    # how far ahead to look for a free slot
+
+    # --- Student type-ahead (/students/search) ---
+    STUDENT_SEARCH_LIMIT = 10    # suggestions unless ?limit= asks for more
+    STUDENT_SEARCH_MAX = 50
+    STUDENT_SEARCH_TTL = 600     # seconds before a worker reloads its index; local edits apply at once
+
+    # --- Report snapshot ---
+    SNAPSHOT_PATH = os.path.join(BASE_DIR, 'instance/snapshot.db')
+    SNAPSHOT_INTERVAL = 300    # seconds between refreshes
+    SNAPSHOT_MAX_AGE = 3600    # older snapshots are ignored and reports read the live database
+
+    # --- Parent dashboard ---
+    PARENT_DASHBOARD_TTL = 300          # seconds a parent's summary is cached (per worker process)
+    PARENT_DASHBOARD_CACHE_SIZE = 1000  # parents cached at once
+    PARENT_DASHBOARD_ITEMS = 5          # upcoming classes and absences shown per child
+    PARENT_DASHBOARD_ABSENCE_DAYS = 30
+
+    # --- Password hashing ---
+    PASSWORD_HASH_METHOD = 'scrypt:32768:8:1'   # full werkzeug method string; changing it rehashes on next login
+    PASSWORD_HASH_WORKERS = 4       # threads computing hashes per worker process
+    PASSWORD_MAX_PENDING = 32       # hashes queued or running before logins get a 503
+    PASSWORD_WAIT_SECONDS = 2
+
+    # --- Streamed listings ---
+    STREAM_YIELD_PER = 500          # rows fetched per batch while a page streams
+    STREAM_CHUNK_BYTES = 16 * 1024  # HTML written to the client at a time
+
+    # --- Logged-in user cache (per worker process) ---
+    IDENTITY_CACHE_SIZE = 1024   # users kept
+    IDENTITY_CACHE_TTL = 60      # seconds; edits in this process invalidate at once
+
+    # --- Reverse proxy ---
+    # Arguments for werkzeug's ProxyFix, e.g. {'x_for': 1, 'x_proto': 1} behind
+    # one nginx, so request.remote_addr is the client's address. Leave unset
+    # when clients connect directly: they could forge X-Forwarded-For.
+    PROXY_FIX = None
+
+    # --- Admission control (per worker process) ---
+    CONCURRENCY_LIMITS = {
+        'upload': {'slots': 2, 'timeout': 5},     # big uploads running at once; wait up to 5s for a slot
+        'report': {'slots': 2, 'timeout': 10},    # admin listings
+    }
+    RATE_LIMITS = {
+        'login': {'burst': 10, 'per_second': 1 / 6},     # login attempts per account and IP
+        'upload': {'burst': 5, 'per_second': 1 / 60},    # uploads per IP
+    }
+
+
+class DevelopmentConfig(Config):
+    DEBUG = True
+
+
+class ProductionConfig(Config):
+    pass
+
+
+class TestingConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SCHEDULER_ENABLED = False
+    ADMISSION_ENABLED = False
+
+
+config = {
+    'development': DevelopmentConfig,
+    'production': ProductionConfig,
+    'testing': TestingConfig,
+}
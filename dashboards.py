@@ -0,0 +1,193 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import case, func, select
+
+import archive
+from extensions import db
+from models import Student, Course, Teacher, Studymaterial, Progress, Live_class
+
+
+def _children(parent_id):
+    return db.session.execute(
+        select(Student.id, Student.name, Student.grade, Student.course_id, Course.name.label('course_name'))
+        .outerjoin(Course, Student.course_id == Course.id)
+        .where(Student.parent_id == parent_id)
+        .order_by(Student.name)).all()
+
+
+def _attendance(student_ids):
+    # Includes rows moved to the attendance archive
+    source = archive.attendance_source()
+    return {row.student_id: row for row in db.session.execute(
+        select(source.c.student_id, func.count().label('days'),
+               func.sum(case((source.c.status == 'Present', 1), else_=0)).label('present'))
+        .where(source.c.student_id.in_(student_ids))
+        .group_by(source.c.student_id))}
+
+
+def attendance_percent(student_id):
+    """Share of a student's marked days they were present, or None."""
+    row = _attendance([student_id]).get(student_id)
+    return row.present * 100 / row.days if row and row.days else None
+
+
+def _recent_absences(student_ids, since, per_child):
+    source = archive.attendance_source()
+    ranked = (select(source.c.student_id, source.c.date,
+                     func.row_number().over(partition_by=source.c.student_id,
+                                            order_by=source.c.date.desc()).label('rank'))
+              .where(source.c.student_id.in_(student_ids), source.c.status == 'Absent', source.c.date >= since)
+              .subquery())
+    absences = {}
+    for row in db.session.execute(select(ranked.c.student_id, ranked.c.date)
+                                  .where(ranked.c.rank <= per_child).order_by(ranked.c.date.desc())):
+        absences.setdefault(row.student_id, []).append(row.date)
+    return absences
+
+
+def _materials_viewed(student_ids):
+    return dict(db.session.execute(
+        select(Progress.student_id, func.count())
+        .where(Progress.student_id.in_(student_ids), Progress.viewed.is_(True))
+        .group_by(Progress.student_id)).all())
+
+
+def _materials_per_course(course_ids):
+    return dict(db.session.execute(
+        select(Teacher.course_id, func.count(Studymaterial.id))
+        .join(Teacher, Studymaterial.teacher_id == Teacher.id)
+        .where(Teacher.course_id.in_(course_ids))
+        .group_by(Teacher.course_id)).all())
+
+
+def _upcoming_classes(course_ids, now, per_course):
+    upcoming = (Live_class.date > now.date()) | ((Live_class.date == now.date()) & (Live_class.time >= now.time()))
+    ranked = (select(Live_class.course_id, Live_class.title, Live_class.date, Live_class.time, Live_class.link,
+                     func.row_number().over(partition_by=Live_class.course_id,
+                                            order_by=(Live_class.date, Live_class.time)).label('rank'))
+              .where(Live_class.course_id.in_(course_ids), upcoming)
+              .subquery())
+    classes = {}
+    for row in db.session.execute(select(ranked).where(ranked.c.rank <= per_course)
+                                  .order_by(ranked.c.date, ranked.c.time)):
+        classes.setdefault(row.course_id, []).append(row)
+    return classes
+
+
+def parent_summary(parent_id):
+    """Attendance, progress, upcoming live classes and recent absences for
+    each of a parent's children.
+
+    Each figure comes from one query grouped by child or course, so a
+    parent with five children costs the same six queries as one with one.
+    """
+    children = _children(parent_id)
+    if not children:
+        return []
+    student_ids = [child.id for child in children]
+    course_ids = {child.course_id for child in children if child.course_id}
+
+    config = current_app.config
+    now = datetime.now()
+    attendance = _attendance(student_ids)
+    absences = _recent_absences(student_ids, date.today() - timedelta(days=config['PARENT_DASHBOARD_ABSENCE_DAYS']),
+                                config['PARENT_DASHBOARD_ITEMS'])
+    viewed = _materials_viewed(student_ids)
+    materials = _materials_per_course(course_ids) if course_ids else {}
+    classes = _upcoming_classes(course_ids, now, config['PARENT_DASHBOARD_ITEMS']) if course_ids else {}
+
+    summary = []
+    for child in children:
+        days = attendance[child.id].days if child.id in attendance else 0
+        present = attendance[child.id].present if child.id in attendance else 0
+        total_materials = materials.get(child.course_id, 0)
+        summary.append({
+            "id": child.id,
+            "name": child.name,
+            "grade": child.grade,
+            "course_name": child.course_name,
+            "attendance_days": days,
+            "attendance_percent": present * 100 / days if days else None,
+            "materials_viewed": viewed.get(child.id, 0),
+            "materials_total": total_materials,
+            "progress_percent": min(100.0, viewed.get(child.id, 0) * 100 / total_materials) if total_materials else None,
+            "upcoming_classes": classes.get(child.course_id, []),
+            "recent_absences": absences.get(child.id, []),
+        })
+    return summary
+
+
+class ParentDashboards:
+    """Per-parent cache of parent_summary().
+
+    Entries live for PARENT_DASHBOARD_TTL seconds and are dropped as soon
+    as attendance or progress is written for one of the parent's children;
+    call invalidate_students() after such writes. The cache is per worker
+    process, so another worker may show figures up to the TTL old.
+    """
+
+    def __init__(self):
+        self.app = None
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # parent_id -> (expires, student ids, summary)
+        self._parents = {}              # student_id -> parent_id, for cached parents
+        self._generation = 0            # bumped by every invalidation
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault('PARENT_DASHBOARD_TTL', 300)
+        app.config.setdefault('PARENT_DASHBOARD_CACHE_SIZE', 1000)
+        app.config.setdefault('PARENT_DASHBOARD_ITEMS', 5)
+        app.config.setdefault('PARENT_DASHBOARD_ABSENCE_DAYS', 30)
+        app.extensions['parent_dashboards'] = self
+
+    def get(self, parent_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(parent_id)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(parent_id)
+                return entry[2]
+            generation = self._generation
+
+        config = self.app.config
+        summary = parent_summary(parent_id)
+        with self._lock:
+            if generation != self._generation:
+                # Something was written while we computed; don't cache what may be stale
+                return summary
+            self._drop(parent_id)
+            student_ids = [child['id'] for child in summary]
+            self._entries[parent_id] = (now + config['PARENT_DASHBOARD_TTL'], student_ids, summary)
+            for student_id in student_ids:
+                self._parents[student_id] = parent_id
+            while len(self._entries) > config['PARENT_DASHBOARD_CACHE_SIZE']:
+                self._drop(next(iter(self._entries)))
+        return summary
+
+    def _drop(self, parent_id):
+        entry = self._entries.pop(parent_id, None)
+        if entry:
+            for student_id in entry[1]:
+                self._parents.pop(student_id, None)
+
+    def invalidate_students(self, student_ids):
+        with self._lock:
+            self._generation += 1
+            for student_id in set(student_ids):
+                parent_id = self._parents.get(student_id)
+                if parent_id is not None:
+                    self._drop(parent_id)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._parents.clear()
+
+
+parent_dashboards = ParentDashboards()
@@ -0,0 +1,116 @@
+import hashlib
+import hmac
+import os
+import posixpath
+import time
+from urllib.parse import quote
+
+from flask import current_app, has_request_context
+from flask import request as flask_request
+from werkzeug.exceptions import Forbidden, NotFound
+from werkzeug.security import safe_join
+from werkzeug.utils import send_file
+from werkzeug.wrappers import Request, Response
+
+# URL kind -> config key of the folder it is served from
+KINDS = {
+    'materials': 'MATERIAL_FOLDER',
+    'videos': 'UPLOAD_FOLDER_VIDEOS',
+}
+
+
+def _signature(key, kind, filename, expires):
+    message = f"{kind}/{filename}:{expires}".encode('utf-8')
+    return hmac.new(key, message, hashlib.sha256).hexdigest()[:32]
+
+
+def signed_url(kind, filename, ttl=None):
+    """Time-limited link to an uploaded file, checked by SignedDownloads."""
+    config = current_app.config
+    ttl = ttl or config['DOWNLOAD_URL_TTL']
+    # Round the expiry up to the minute so a page rendered twice in a row
+    # gives the browser the same URLs to cache
+    expires = (int(time.time()) + ttl + 59) // 60 * 60
+    signature = _signature(_key(config, current_app.secret_key), kind, filename, expires)
+    root = flask_request.script_root if has_request_context() else ''
+    return f"{root}{config['DOWNLOAD_URL_PREFIX']}/{kind}/{quote(filename)}?e={expires}&s={signature}"
+
+
+def _key(config, secret_key):
+    return (config.get('DOWNLOAD_SIGNING_KEY') or secret_key).encode('utf-8')
+
+
+class SignedDownloads:
+    """WSGI middleware serving signed file URLs in front of Flask.
+
+    Downloads never reach the Flask app: no session, no database, no
+    before_request hooks. Only the signature and expiry are checked before
+    the file is handed to Werkzeug's send_file (Range and conditional
+    requests included) or offloaded to the web server.
+    """
+
+    def __init__(self, wsgi_app, app):
+        self.wsgi_app = wsgi_app
+        self.app = app
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        config = self.app.config
+        prefix = config['DOWNLOAD_URL_PREFIX'] + '/'
+
+        if path.startswith(prefix):
+            response = self.serve(environ, len(prefix))
+            return response(environ, start_response)
+        if config['PROTECT_STATIC_UPLOADS'] and self.is_static_upload(path):
+            return NotFound()(environ, start_response)
+        return self.wsgi_app(environ, start_response)
+
+    def is_static_upload(self, path):
+        # The static route resolves "." and ".." itself, so compare the
+        # normalised path, and refuse ".." outright rather than reason about it
+        if '..' in path.split('/'):
+            return True
+        uploads = f"{self.app.static_url_path}/uploads"
+        path = posixpath.normpath('/' + path.lstrip('/'))
+        return path == uploads or path.startswith(uploads + '/')
+
+    def serve(self, environ, prefix_length):
+        config = self.app.config
+        request = Request(environ)
+        args = request.args
+
+        kind, _, filename = request.path[prefix_length:].partition('/')
+        folder = config.get(KINDS.get(kind, ''))
+        expires = args.get('e', type=int)
+        signature = args.get('s', '')
+        if not folder or not filename or not expires:
+            return NotFound()
+
+        now = int(time.time())
+        expected = _signature(_key(config, self.app.secret_key), kind, filename, expires)
+        if expires < now or not hmac.compare_digest(signature, expected):
+            return Forbidden()
+
+        file_path = safe_join(folder, filename)
+        if file_path is None or not os.path.isfile(file_path):
+            return NotFound()
+
+        accel_prefix = config.get('DOWNLOAD_ACCEL_PREFIX')
+        if accel_prefix:
+            # nginx serves the file from an internal location
+            response = Response(headers={'X-Accel-Redirect': f"{accel_prefix}/{kind}/{quote(filename)}"})
+        else:
+            response = send_file(file_path, environ, conditional=True,
+                                 use_x_sendfile=config.get('USE_X_SENDFILE', False))
+        response.headers['Cache-Control'] = f"private, max-age={expires - now}"
+        return response
+
+
+def init_app(app):
+    app.config.setdefault('DOWNLOAD_URL_PREFIX', '/files')
+    app.config.setdefault('DOWNLOAD_URL_TTL', 60 * 60)
+    app.config.setdefault('DOWNLOAD_SIGNING_KEY', None)
+    app.config.setdefault('DOWNLOAD_ACCEL_PREFIX', None)
+    app.config.setdefault('PROTECT_STATIC_UPLOADS', True)
+    app.wsgi_app = SignedDownloads(app.wsgi_app, app)
+    app.jinja_env.globals['signed_url'] = signed_url
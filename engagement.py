@@ -0,0 +1,115 @@
+from collections import Counter
+from datetime import datetime
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.sqlite import insert
+
+from extensions import db
+from models import Progress, Studymaterial, Material_engagement, Student
+
+
+def record_views(items):
+    """Write a batch of (student_id, material_id) views to Progress and fold
+    them into Material_engagement, in the caller's transaction.
+
+    The rollup is bumped by exactly what this batch added, so keeping it
+    current costs the same however many Progress rows there are. A row whose
+    view count comes back equal to this batch's is one the upsert created,
+    i.e. a new viewer.
+    """
+    counts = Counter(items)
+    rows = [{"student_id": student_id, "material_id": material_id, "viewed": True, "views": views}
+            for (student_id, material_id), views in counts.items()]
+    stmt = insert(Progress.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['student_id', 'material_id'],
+        set_={'viewed': True, 'views': Progress.__table__.c.views + stmt.excluded.views},
+    ).returning(Progress.__table__.c.student_id, Progress.__table__.c.material_id, Progress.__table__.c.views)
+    written = db.session.execute(stmt, rows).all()
+
+    deltas = {}
+    for student_id, material_id, total in written:
+        views = counts[(student_id, material_id)]
+        delta = deltas.setdefault(material_id, [0, 0])
+        delta[0] += views
+        delta[1] += total == views
+    if deltas:
+        now = datetime.now()
+        stmt = insert(Material_engagement)
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=['material_id'],
+            set_={'views': Material_engagement.views + stmt.excluded.views,
+                  'viewers': Material_engagement.viewers + stmt.excluded.viewers,
+                  'updated_at': stmt.excluded.updated_at}),
+            [{"material_id": material_id, "views": views, "viewers": viewers, "updated_at": now}
+             for material_id, (views, viewers) in deltas.items()])
+    return counts
+
+
+def rebuild(teacher_id=None):
+    """Recount Material_engagement from Progress, for one teacher's
+    materials or for all. One GROUP BY over Progress joined to Studymaterial;
+    use it to seed or repair the rollup, not on every request."""
+    materials = select(Studymaterial.id)
+    if teacher_id is not None:
+        materials = materials.where(Studymaterial.teacher_id == teacher_id)
+
+    totals = db.session.execute(
+        select(Progress.material_id, func.sum(Progress.views), func.count())
+        .join(Studymaterial, Progress.material_id == Studymaterial.id)
+        .where(Progress.viewed.is_(True), Progress.material_id.in_(materials))
+        .group_by(Progress.material_id)).all()
+
+    now = datetime.now()
+    db.session.execute(delete(Material_engagement).where(Material_engagement.material_id.in_(materials)))
+    if totals:
+        db.session.execute(insert(Material_engagement), [
+            {"material_id": material_id, "views": views, "viewers": viewers, "updated_at": now}
+            for material_id, views, viewers in totals])
+    db.session.commit()
+    return len(totals)
+
+
+def teacher_materials(teacher_id):
+    """A teacher's materials with their rollup figures, newest first."""
+    return db.session.execute(
+        select(Studymaterial.id, Studymaterial.title, Studymaterial.subject, Studymaterial.upload_date,
+               func.coalesce(Material_engagement.views, 0).label('views'),
+               func.coalesce(Material_engagement.viewers, 0).label('viewers'))
+        .outerjoin(Material_engagement, Material_engagement.material_id == Studymaterial.id)
+        .where(Studymaterial.teacher_id == teacher_id)
+        .order_by(Studymaterial.upload_date.desc(), Studymaterial.id.desc())).all()
+
+
+def not_viewed(teacher_id, course_id, per_material):
+    """Students of the course who haven't opened each of the teacher's
+    materials: {material_id: (count, first per_material names)}."""
+    has_viewed = (select(Progress.id)
+                  .where(Progress.student_id == Student.id, Progress.material_id == Studymaterial.id)
+                  .exists())
+    ranked = (select(Studymaterial.id.label('material_id'), Student.name,
+                     func.row_number().over(partition_by=Studymaterial.id, order_by=Student.name).label('rank'),
+                     func.count().over(partition_by=Studymaterial.id).label('missing'))
+              .join(Student, Student.course_id == course_id)
+              .where(Studymaterial.teacher_id == teacher_id, ~has_viewed)
+              .subquery())
+    result = {}
+    for row in db.session.execute(select(ranked).where(ranked.c.rank <= per_material)
+                                  .order_by(ranked.c.material_id, ranked.c.rank)):
+        result.setdefault(row.material_id, (row.missing, []))[1].append(row.name)
+    return result
+
+
+@click.command("material-engagement-rebuild")
+@click.option("--teacher", "teacher_id", type=int, help="Only this teacher's materials.")
+@with_appcontext
+def rebuild_command(teacher_id):
+    """Recount material views from Progress."""
+    click.echo(f"Rebuilt engagement for {rebuild(teacher_id)} materials.")
+
+
+def init_app(app):
+    app.config.setdefault('MATERIAL_ANALYTICS_NOT_VIEWED', 20)
+    app.cli.add_command(rebuild_command)
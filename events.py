@@ -0,0 +1,94 @@
+import json
+import queue
+import threading
+
+
+class Subscriber:
+    def __init__(self, channels, queue_size):
+        self.channels = channels
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.closed = False
+        self.registered = True
+
+
+class EventBroker:
+    """In-process pub/sub used by the /events Server-Sent Events stream.
+
+    Each connected client gets a bounded queue. A client that can't keep up
+    is disconnected instead of letting its queue grow; the browser's
+    EventSource reconnects on its own.
+    """
+
+    def __init__(self, max_connections=200, queue_size=50, heartbeat=15):
+        self.max_connections = max_connections
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self._lock = threading.Lock()
+        self._channels = {}
+        self._connections = 0
+
+    def init_app(self, app):
+        self.max_connections = app.config.get('SSE_MAX_CONNECTIONS', self.max_connections)
+        self.queue_size = app.config.get('SSE_QUEUE_SIZE', self.queue_size)
+        self.heartbeat = app.config.get('SSE_HEARTBEAT_SECONDS', self.heartbeat)
+        app.extensions['event_broker'] = self
+
+    @property
+    def connections(self):
+        return self._connections
+
+    def subscribe(self, channels):
+        # Returns None when the connection cap is reached
+        with self._lock:
+            if self._connections >= self.max_connections:
+                return None
+            sub = Subscriber(channels, self.queue_size)
+            for channel in channels:
+                self._channels.setdefault(channel, set()).add(sub)
+            self._connections += 1
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            if not sub.registered:
+                return
+            sub.registered = False
+            for channel in sub.channels:
+                subs = self._channels.get(channel)
+                if subs is not None:
+                    subs.discard(sub)
+                    if not subs:
+                        del self._channels[channel]
+            self._connections -= 1
+        sub.closed = True
+
+    def publish(self, channel, event, data):
+        with self._lock:
+            subs = list(self._channels.get(channel, ()))
+        if not subs:
+            return 0
+
+        # Format once, hand the same string to every subscriber
+        message = f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+        delivered = 0
+        for sub in subs:
+            try:
+                sub.queue.put_nowait(message)
+                delivered += 1
+            except queue.Full:
+                sub.closed = True
+        return delivered
+
+    def stream(self, sub):
+        try:
+            yield f"retry: {self.heartbeat * 1000}\n\n"
+            while not sub.closed:
+                try:
+                    yield sub.queue.get(timeout=self.heartbeat)
+                except queue.Empty:
+                    yield ": ping\n\n"
+        finally:
+            self.unsubscribe(sub)
+
+
+broker = EventBroker()
@@ -0,0 +1,272 @@
+import multiprocessing
+import os
+import re
+import signal
+import threading
+import time
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from functools import partial
+from xml.etree import ElementTree
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+import search
+from extensions import db
+from models import Studymaterial, Material_text
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # PDF text extraction is optional
+    PdfReader = None
+
+
+EXTRACTABLE = {'pdf', 'docx', 'pptx', 'txt'}
+
+_W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_A_NS = '{http://schemas.openxmlformats.org/drawingml/2006/main}'
+
+
+# --- Readers (run inside the worker processes) ---
+
+def _read_txt(path):
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        while True:
+            chunk = f.read(64 * 1024)
+            if not chunk:
+                break
+            yield chunk
+
+
+def _read_xml_text(archive, member, text_tag, break_tag):
+    with archive.open(member) as f:
+        for event, elem in ElementTree.iterparse(f):
+            if elem.tag == text_tag and elem.text:
+                yield elem.text
+            elif elem.tag == break_tag:
+                yield '\n'
+            elem.clear()
+
+
+def _read_docx(path):
+    with zipfile.ZipFile(path) as archive:
+        yield from _read_xml_text(archive, 'word/document.xml', _W_NS + 't', _W_NS + 'p')
+
+
+def _read_pptx(path):
+    with zipfile.ZipFile(path) as archive:
+        slides = [n for n in archive.namelist() if re.fullmatch(r'ppt/slides/slide\d+\.xml', n)]
+        slides.sort(key=lambda n: int(re.search(r'\d+', n).group()))
+        for slide in slides:
+            yield from _read_xml_text(archive, slide, _A_NS + 't', _A_NS + 'p')
+
+
+def _read_pdf(path):
+    if PdfReader is None:
+        return
+    for page in PdfReader(path).pages:
+        yield (page.extract_text() or '') + '\n'
+
+
+_READERS = {'txt': _read_txt, 'docx': _read_docx, 'pptx': _read_pptx, 'pdf': _read_pdf}
+
+
+class _OutOfTime(Exception):
+    pass
+
+
+def _out_of_time(signum, frame):
+    raise _OutOfTime()
+
+
+def _hard_deadline(seconds):
+    # A single PDF page can take arbitrarily long, so the budget between
+    # chunks isn't enough; interrupt the reader itself with a timer. Only
+    # possible in a main thread, which is where the pool workers run it.
+    if not hasattr(signal, 'setitimer') or threading.current_thread() is not threading.main_thread():
+        return False
+    signal.signal(signal.SIGALRM, _out_of_time)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    return True
+
+
+def extract_text(path, max_bytes, max_chars, time_budget):
+    """Pull plain text out of a material file. Returns (status, text).
+
+    Stops early once max_chars have been read or time_budget seconds have
+    passed, and keeps what it has so far. In a worker process the budget
+    also interrupts a reader stuck inside one chunk, such as a single PDF page.
+    """
+    ext = path.rsplit('.', 1)[-1].lower()
+    if ext not in EXTRACTABLE or (ext == 'pdf' and PdfReader is None):
+        return 'skipped', ''
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return 'missing', ''
+    if size > max_bytes:
+        return 'skipped', ''
+
+    deadline = time.monotonic() + time_budget
+    parts = []
+    total = 0
+    timed = _hard_deadline(time_budget)
+    try:
+        for chunk in _READERS[ext](path):
+            parts.append(chunk)
+            total += len(chunk)
+            if total >= max_chars or time.monotonic() > deadline:
+                break
+    except _OutOfTime:
+        pass
+    finally:
+        if timed:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+    content = re.sub(r'[ \t\r\f\v]+', ' ', ''.join(parts))
+    content = re.sub(r'\n\s*\n+', '\n', content).strip()
+    return 'done', content[:max_chars]
+
+
+# --- Storing results (runs in the web/CLI process) ---
+
+def store_text(material_id, status, content):
+    material = db.session.get(Studymaterial, material_id)
+    if material is None:  # deleted while we were extracting
+        return
+
+    row = material.text or Material_text(material_id=material_id)
+    old_content = row.content
+    row.status = status
+    row.content = zlib.compress(content.encode('utf-8')) if content else None
+    row.extracted_at = datetime.now()
+    db.session.add(row)
+
+    search.index_text(material_id, old_content, row.content)
+    db.session.commit()
+
+
+def decompress_text(row):
+    return zlib.decompress(row.content).decode('utf-8') if row.content else ''
+
+
+class TextExtractor:
+    """Runs text extraction for uploaded materials in a process pool so the
+    upload request never waits on it."""
+
+    def __init__(self):
+        self.app = None
+        self._executor = None
+        self._lock = threading.Lock()  # concurrent uploads must not start two pools
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault('EXTRACTION_WORKERS', 2)
+        app.config.setdefault('EXTRACTION_MAX_BYTES', 50 * 1024 * 1024)
+        app.config.setdefault('EXTRACTION_MAX_CHARS', 200_000)
+        app.config.setdefault('EXTRACTION_TIME_BUDGET', 20)  # seconds per file
+        app.extensions['text_extractor'] = self
+        app.cli.add_command(extract_command)
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn rather than fork: the web process runs threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.app.config['EXTRACTION_WORKERS'],
+                    mp_context=multiprocessing.get_context('spawn'),
+                )
+            return self._executor
+
+    def submit(self, material_id, path):
+        """Queue a material for extraction. Called after the upload has been
+        committed, so a broken pool marks the material failed rather than
+        failing the request; 'flask extract-materials --all' retries it."""
+        try:
+            future = self._pool().submit(extract_text, path, *budget(self.app.config))
+        except Exception:
+            self.app.logger.exception("Queueing text extraction for material %s failed", material_id)
+            self.shutdown()  # start a fresh pool next time
+            self._store_failed(material_id)
+            return None
+        future.add_done_callback(partial(self._store, material_id))
+        return future
+
+    def _store_failed(self, material_id):
+        try:
+            store_text(material_id, 'failed', '')
+        except Exception:
+            db.session.rollback()
+            self.app.logger.exception("Could not mark material %s as failed", material_id)
+
+    def _store(self, material_id, future):
+        if future.exception() is not None:
+            status, content = 'failed', ''
+        else:
+            status, content = future.result()
+        with self.app.app_context():
+            try:
+                store_text(material_id, status, content)
+            except Exception:
+                db.session.rollback()
+                self.app.logger.exception("Storing extracted text for material %s failed", material_id)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def budget(config):
+    return (config['EXTRACTION_MAX_BYTES'], config['EXTRACTION_MAX_CHARS'],
+            config['EXTRACTION_TIME_BUDGET'])
+
+
+@click.command("extract-materials")
+@with_appcontext
+@click.option("--workers", default=None, type=int, help="Worker processes (default EXTRACTION_WORKERS).")
+@click.option("--all", "redo", is_flag=True, help="Re-extract materials that already have text.")
+def extract_command(workers, redo):
+    """Extract and index text for existing materials in MATERIAL_FOLDER."""
+    config = current_app.config
+    workers = workers or config['EXTRACTION_WORKERS']
+
+    query = db.session.query(Studymaterial.id, Studymaterial.filename)
+    if not redo:
+        query = query.outerjoin(Material_text).filter(Material_text.material_id.is_(None))
+    pending = query.order_by(Studymaterial.id).all()
+    click.echo(f"{len(pending)} materials to extract with {workers} workers")
+
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        in_flight = {}
+        todo = iter(pending)
+        while True:
+            # Keep at most two files per worker queued
+            while len(in_flight) < workers * 2:
+                item = next(todo, None)
+                if item is None:
+                    break
+                path = os.path.join(config['MATERIAL_FOLDER'], item.filename)
+                in_flight[pool.submit(extract_text, path, *budget(config))] = item.id
+            if not in_flight:
+                break
+
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                material_id = in_flight.pop(future)
+                status, content = ('failed', '') if future.exception() else future.result()
+                store_text(material_id, status, content)
+                done += 1
+                if done % 50 == 0:
+                    click.echo(f"  {done}/{len(pending)}")
+
+    click.echo(f"Extracted {done} materials.")
+
+
+extractor = TextExtractor()
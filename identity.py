@@ -0,0 +1,130 @@
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, session
+from flask_login import LoginManager, UserMixin, current_user, login_user
+from sqlalchemy import literal, select
+
+from extensions import db
+from models import Student, Teacher, Parent, Course
+
+KINDS = ('student', 'teacher', 'parent')
+
+
+class User(UserMixin):
+    """The logged-in student, teacher or parent: a few columns of their row,
+    enough for headers, scoping and permission checks. Views that edit the
+    profile or need other columns still load the model."""
+
+    __slots__ = ('kind', 'id', 'name', 'email', 'course_id', 'course_name', 'photo')
+
+    def __init__(self, kind, id, name, email, course_id=None, course_name=None, photo=None):
+        self.kind = kind
+        self.id = id
+        self.name = name
+        self.email = email
+        self.course_id = course_id
+        self.course_name = course_name
+        self.photo = photo
+
+    def get_id(self):
+        return f"{self.kind}:{self.id}"
+
+
+def _query(kind, user_id):
+    if kind == 'parent':
+        return select(literal('parent'), Parent.id, Parent.name, Parent.email).where(Parent.id == user_id)
+    model = Student if kind == 'student' else Teacher
+    photo = Teacher.photo if kind == 'teacher' else literal(None)
+    return (select(literal(kind), model.id, model.name, model.email, model.course_id, Course.name, photo)
+            .outerjoin(Course, model.course_id == Course.id)
+            .where(model.id == user_id))
+
+
+class IdentityCache:
+    """Small LRU of User records shared by requests in this process.
+
+    Entries expire after IDENTITY_CACHE_TTL seconds, and invalidate() drops
+    one as soon as the user's row changes here. Other worker processes may
+    keep the old record until it expires, so keep the TTL short.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # 'kind:id' -> (expires, User)
+
+    def get(self, kind, user_id):
+        key = f"{kind}:{user_id}"
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        row = db.session.execute(_query(kind, user_id)).first()
+        user = User(*row) if row else None
+        if user is not None:
+            config = current_app.config
+            with self._lock:
+                self._entries[key] = (now + config['IDENTITY_CACHE_TTL'], user)
+                self._entries.move_to_end(key)
+                while len(self._entries) > config['IDENTITY_CACHE_SIZE']:
+                    self._entries.popitem(last=False)
+        return user
+
+    def invalidate(self, kind, user_id):
+        with self._lock:
+            self._entries.pop(f"{kind}:{user_id}", None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+identities = IdentityCache()
+login_manager = LoginManager()
+login_manager.login_view = 'main.login'
+
+
+@login_manager.user_loader
+def load_user(user_id):
+    # Flask-Login calls this at most once per request and keeps the result in g
+    kind, _, pk = user_id.partition(':')
+    if kind not in KINDS or not pk.isdigit():
+        return None
+    return identities.get(kind, int(pk))
+
+
+@login_manager.request_loader
+def load_user_from_session(request):
+    # Sessions from before Flask-Login only carry <kind>_id
+    for kind in KINDS:
+        user_id = session.get(f'{kind}_id')
+        if user_id:
+            return identities.get(kind, user_id)
+    return None
+
+
+def log_in(kind, user):
+    for other in KINDS:
+        session.pop(f'{other}_id', None)
+    session[f'{kind}_id'] = user.id
+    login_user(identities.get(kind, user.id))
+
+
+def current(kind):
+    """The logged-in user if they are logged in as `kind`, else None."""
+    user_id = session.get(f'{kind}_id')
+    if not user_id:
+        return None
+    if current_user.is_authenticated and current_user.kind == kind and current_user.id == user_id:
+        return current_user._get_current_object()
+    return identities.get(kind, user_id)
+
+
+def init_app(app):
+    app.config.setdefault('IDENTITY_CACHE_SIZE', 1024)
+    app.config.setdefault('IDENTITY_CACHE_TTL', 60)
+    login_manager.init_app(app)
@@ -0,0 +1,168 @@
+import hashlib
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects.sqlite import insert
+
+from dashboards import parent_dashboards
+from events import broker
+from extensions import db
+from models import Attendance, Scanner, Student
+
+STATUSES = ('Present', 'Absent')
+
+_rosters = {}   # course_id (None for every student) -> (expires, frozenset of student ids)
+_rosters_lock = threading.Lock()
+
+
+def hash_token(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def scanner_for_token(token):
+    if not token:
+        return None
+    return Scanner.query.filter_by(token_hash=hash_token(token), active=True).first()
+
+
+def roster(course_id=None):
+    """Ids of the students a scanner may check in, cached for ATTENDANCE_ROSTER_TTL
+    seconds so a busy door doesn't query Student on every batch."""
+    now = time.monotonic()
+    cached = _rosters.get(course_id)
+    if cached and cached[0] > now:
+        return cached[1]
+    query = select(Student.id)
+    if course_id is not None:
+        query = query.where(Student.course_id == course_id)
+    ids = frozenset(db.session.scalars(query))
+    with _rosters_lock:
+        _rosters[course_id] = (now + current_app.config['ATTENDANCE_ROSTER_TTL'], ids)
+    return ids
+
+
+def clear_rosters():
+    """Forget cached rosters, e.g. after a student registers or changes course."""
+    with _rosters_lock:
+        _rosters.clear()
+
+
+def _parse(event, now, students):
+    # Returns (student_id, date, status) or raises ValueError with the reason
+    if not isinstance(event, dict):
+        raise ValueError("event must be an object")
+    student_id = event.get('student_id')
+    if not isinstance(student_id, int) or isinstance(student_id, bool):
+        raise ValueError("student_id must be an integer")
+    if student_id not in students:
+        raise ValueError("unknown student")
+
+    try:
+        timestamp = datetime.fromisoformat(event.get('timestamp'))
+    except (TypeError, ValueError):
+        raise ValueError("timestamp must be an ISO 8601 date and time")
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone().replace(tzinfo=None)
+    config = current_app.config
+    if timestamp > now + timedelta(seconds=config['ATTENDANCE_CLOCK_SKEW']):
+        raise ValueError("timestamp is in the future")
+    if timestamp < now - timedelta(days=config['ATTENDANCE_MAX_EVENT_AGE_DAYS']):
+        raise ValueError("timestamp is too old")
+
+    status = event.get('status', 'Present')
+    if status not in STATUSES:
+        raise ValueError(f"status must be one of {', '.join(STATUSES)}")
+    return student_id, timestamp.date(), status
+
+
+def ingest_attendance(scanner, events):
+    """Record a batch of check-ins from a scanner in one transaction.
+
+    Each event is {"student_id", "timestamp", "status"}. The first event for
+    a student and day wins: later ones in the batch come back as
+    "duplicate", and days that already have a mark as "exists", so scanners
+    can safely resend a batch after a timeout. Returns one result per event,
+    in order: {"index", "status"} plus "error" for rejected events.
+    """
+    now = datetime.now()
+    students = roster(scanner.course_id)
+    results = []
+    accepted = {}   # (student_id, date) -> (index, status)
+    for index, event in enumerate(events):
+        try:
+            student_id, day, status = _parse(event, now, students)
+        except ValueError as exc:
+            results.append({"index": index, "status": "rejected", "error": str(exc)})
+            continue
+        if (student_id, day) in accepted:
+            results.append({"index": index, "status": "duplicate"})
+            continue
+        accepted[(student_id, day)] = (index, status)
+        results.append({"index": index, "status": "created"})
+
+    if accepted:
+        existing = set(db.session.execute(
+            select(Attendance.student_id, Attendance.date)
+            .where(tuple_(Attendance.student_id, Attendance.date).in_(list(accepted)))).all())
+        rows = []
+        for (student_id, day), (index, status) in accepted.items():
+            if (student_id, day) in existing:
+                results[index]["status"] = "exists"
+                continue
+            rows.append({"student_id": student_id, "teacher_id": scanner.teacher_id,
+                         "date": day, "status": status})
+        if rows:
+            # A mark made between the check above and this insert is kept, not overwritten
+            db.session.execute(insert(Attendance).on_conflict_do_nothing(
+                index_elements=['student_id', 'date']), rows)
+    scanner.last_seen_at = now
+    db.session.commit()
+    parent_dashboards.invalidate_students(student_id for student_id, _ in accepted)
+
+    for (student_id, day), (index, status) in accepted.items():
+        if results[index]["status"] == "created":
+            broker.publish(f"student:{student_id}", "attendance", {"date": day, "status": status})
+    return results
+
+
+@click.command("scanner-add")
+@click.argument("name")
+@click.option("--course", "course_id", type=int, help="Only accept students of this course.")
+@click.option("--teacher", "teacher_id", type=int, help="Teacher recorded as marking the attendance.")
+@with_appcontext
+def add_scanner_command(name, course_id, teacher_id):
+    """Register a scanner and print its API token."""
+    token = secrets.token_urlsafe(32)
+    scanner = Scanner(name=name, token_hash=hash_token(token), course_id=course_id,
+                      teacher_id=teacher_id, active=True, created_at=datetime.now())
+    db.session.add(scanner)
+    db.session.commit()
+    click.echo(f"Scanner {scanner.id} ({name}) token, shown only once:\n{token}")
+
+
+@click.command("scanner-revoke")
+@click.argument("scanner_id", type=int)
+@with_appcontext
+def revoke_scanner_command(scanner_id):
+    """Stop accepting a scanner's token."""
+    scanner = db.session.get(Scanner, scanner_id)
+    if scanner is None:
+        raise click.ClickException(f"No scanner {scanner_id}.")
+    scanner.active = False
+    db.session.commit()
+    click.echo(f"Revoked scanner {scanner_id} ({scanner.name}).")
+
+
+def init_app(app):
+    app.config.setdefault('ATTENDANCE_BATCH_MAX', 5000)
+    app.config.setdefault('ATTENDANCE_ROSTER_TTL', 300)
+    app.config.setdefault('ATTENDANCE_MAX_EVENT_AGE_DAYS', 7)
+    app.config.setdefault('ATTENDANCE_CLOCK_SKEW', 300)
+    app.cli.add_command(add_scanner_command)
+    app.cli.add_command(revoke_scanner_command)
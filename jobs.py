@@ -0,0 +1,54 @@
+import threading
+import time
+
+
+class Scheduler:
+    """Runs periodic maintenance jobs on background threads.
+
+    Jobs start with the first request, so CLI commands and migrations never
+    run them. Every worker process runs its own copy, so jobs must be safe
+    to run concurrently.
+    """
+
+    def __init__(self):
+        self.app = None
+        self._jobs = []
+        self._started = False
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['scheduler'] = self
+        app.before_request(self._start_once)
+
+    def add(self, name, interval, func):
+        # Replaces a job of the same name, e.g. when create_app() runs again
+        self._jobs = [job for job in self._jobs if job[0] != name]
+        self._jobs.append((name, interval, func))
+
+    def _start_once(self):
+        if self._started or not self.app.config.get('SCHEDULER_ENABLED', True):
+            return
+        with self._lock:
+            if self._started:
+                return
+            for name, interval, func in self._jobs:
+                thread = threading.Thread(target=self._run, args=(name, interval, func),
+                                          name=f"job-{name}", daemon=True)
+                thread.start()
+            self._started = True
+
+    def _run(self, name, interval, func):
+        while True:
+            time.sleep(interval)
+            self.run_now(name, func)
+
+    def run_now(self, name, func):
+        with self.app.app_context():
+            try:
+                func()
+            except Exception:
+                self.app.logger.exception("Scheduled job %s failed", name)
+
+
+scheduler = Scheduler()
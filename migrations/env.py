@@ -5,6 +5,8 @@ from flask import current_app
 
 from alembic import context
 
+from backfill import CHECKPOINT_TABLE, recover_alembic_tmp_tables
+
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
@@ -51,6 +53,17 @@ def get_metadata():
     return target_db.metadata
 
 
+# Tables no model describes, which autogenerate would otherwise drop: the
+# FTS5 search tables and their shadow tables, and backfill checkpoints
+UNMANAGED_TABLES = ('search_index', 'search_text', CHECKPOINT_TABLE)
+
+
+def include_name(name, type_, parent_names):
+    if type_ == 'table':
+        return not name.startswith(UNMANAGED_TABLES)
+    return True
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -65,7 +78,8 @@ def run_migrations_offline():
     """
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=get_metadata(), literal_binds=True
+        url=url, target_metadata=get_metadata(), literal_binds=True,
+        include_name=include_name
     )
 
     with context.begin_transaction():
@@ -97,9 +111,14 @@ def run_migrations_online():
     connectable = get_engine()
 
     with connectable.connect() as connection:
+        # A batch migration that died halfway leaves an _alembic_tmp_ table
+        # behind that makes the next run fail
+        recover_alembic_tmp_tables(connection)
+
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
+            include_name=include_name,
             **conf_args
         )
 
@@ -0,0 +1,98 @@
+"""add search index
+
+Revision ID: 3a7c91e4d2b8
+Revises: 80d939492a0a
+Create Date: 2026-10-19 10:12:41.530214
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3a7c91e4d2b8'
+down_revision = '80d939492a0a'
+branch_labels = None
+depends_on = None
+
+
+# rowid = ref_id * 4 + kind code (1 material, 2 recorded class, 3 live class)
+# so the triggers can update and delete index rows by rowid.
+TRIGGERS = [
+    """CREATE TRIGGER search_material_ai AFTER INSERT ON "Studymaterial" BEGIN
+        INSERT INTO search_index(rowid, kind, ref_id, course_id, title, body, subject)
+        VALUES (new.id * 4 + 1, 'material', new.id,
+                (SELECT course_id FROM "Teacher" WHERE id = new.teacher_id),
+                new.title, new.description, new.subject);
+    END""",
+    """CREATE TRIGGER search_material_au AFTER UPDATE OF title, description, subject ON "Studymaterial" BEGIN
+        UPDATE search_index SET title = new.title, body = new.description, subject = new.subject
+        WHERE rowid = new.id * 4 + 1;
+    END""",
+    """CREATE TRIGGER search_material_ad AFTER DELETE ON "Studymaterial" BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 4 + 1;
+    END""",
+    """CREATE TRIGGER search_recorded_ai AFTER INSERT ON "Recorded_class" BEGIN
+        INSERT INTO search_index(rowid, kind, ref_id, course_id, title, body, subject)
+        VALUES (new.id * 4 + 2, 'recorded_class', new.id, new.course_id, new.title, '',
+                (SELECT name FROM "Course" WHERE id = new.course_id));
+    END""",
+    """CREATE TRIGGER search_recorded_au AFTER UPDATE OF title, course_id ON "Recorded_class" BEGIN
+        UPDATE search_index SET title = new.title, course_id = new.course_id,
+            subject = (SELECT name FROM "Course" WHERE id = new.course_id)
+        WHERE rowid = new.id * 4 + 2;
+    END""",
+    """CREATE TRIGGER search_recorded_ad AFTER DELETE ON "Recorded_class" BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 4 + 2;
+    END""",
+    """CREATE TRIGGER search_live_ai AFTER INSERT ON "Live_class" BEGIN
+        INSERT INTO search_index(rowid, kind, ref_id, course_id, title, body, subject)
+        VALUES (new.id * 4 + 3, 'live_class', new.id, new.course_id, new.title, new.platform,
+                (SELECT name FROM "Course" WHERE id = new.course_id));
+    END""",
+    """CREATE TRIGGER search_live_au AFTER UPDATE OF title, platform, course_id ON "Live_class" BEGIN
+        UPDATE search_index SET title = new.title, body = new.platform, course_id = new.course_id,
+            subject = (SELECT name FROM "Course" WHERE id = new.course_id)
+        WHERE rowid = new.id * 4 + 3;
+    END""",
+    """CREATE TRIGGER search_live_ad AFTER DELETE ON "Live_class" BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 4 + 3;
+    END""",
+]
+
+
+def upgrade():
+    op.execute("""
+        CREATE VIRTUAL TABLE search_index USING fts5(
+            kind UNINDEXED, ref_id UNINDEXED, course_id UNINDEXED,
+            title, body, subject,
+            tokenize = 'porter unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )
+    """)
+    for trigger in TRIGGERS:
+        op.execute(trigger)
+
+    # Index what is already there
+    op.execute("""
+        INSERT INTO search_index(rowid, kind, ref_id, course_id, title, body, subject)
+        SELECT m.id * 4 + 1, 'material', m.id, t.course_id, m.title, m.description, m.subject
+        FROM "Studymaterial" m LEFT JOIN "Teacher" t ON t.id = m.teacher_id
+    """)
+    op.execute("""
+        INSERT INTO search_index(rowid, kind, ref_id, course_id, title, body, subject)
+        SELECT r.id * 4 + 2, 'recorded_class', r.id, r.course_id, r.title, '', c.name
+        FROM "Recorded_class" r LEFT JOIN "Course" c ON c.id = r.course_id
+    """)
+    op.execute("""
+        INSERT INTO search_index(rowid, kind, ref_id, course_id, title, body, subject)
+        SELECT l.id * 4 + 3, 'live_class', l.id, l.course_id, l.title, l.platform, c.name
+        FROM "Live_class" l LEFT JOIN "Course" c ON c.id = l.course_id
+    """)
+
+
+def downgrade():
+    for trigger in TRIGGERS:
+        name = trigger.split()[2]
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.execute("DROP TABLE IF EXISTS search_index")
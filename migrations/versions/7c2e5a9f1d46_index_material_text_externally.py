@@ -0,0 +1,88 @@
+"""index material text externally
+
+Revision ID: 7c2e5a9f1d46
+Revises: 4e8a1c6d9b30
+Create Date: 2026-10-20 09:41:06.225817
+
+"""
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c2e5a9f1d46'
+down_revision = '4e8a1c6d9b30'
+branch_labels = None
+depends_on = None
+
+
+def _inflate(value):
+    return zlib.decompress(value).decode('utf-8') if value else None
+
+
+def _register_inflate():
+    # The app registers the same function on every connection (search.init_app)
+    op.get_bind().connection.driver_connection.create_function('inflate', 1, _inflate, deterministic=True)
+
+
+def _create_search_index(columns):
+    op.execute(f"""
+        CREATE VIRTUAL TABLE search_index USING fts5(
+            {columns},
+            tokenize = 'porter unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )
+    """)
+    op.execute("""
+        INSERT INTO search_index(rowid, kind, ref_id, course_id, title, body, subject)
+        SELECT m.id * 4 + 1, 'material', m.id, t.course_id, m.title, m.description, m.subject
+        FROM "Studymaterial" m LEFT JOIN "Teacher" t ON t.id = m.teacher_id
+    """)
+    op.execute("""
+        INSERT INTO search_index(rowid, kind, ref_id, course_id, title, body, subject)
+        SELECT r.id * 4 + 2, 'recorded_class', r.id, r.course_id, r.title, '', c.name
+        FROM "Recorded_class" r LEFT JOIN "Course" c ON c.id = r.course_id
+    """)
+    op.execute("""
+        INSERT INTO search_index(rowid, kind, ref_id, course_id, title, body, subject)
+        SELECT l.id * 4 + 3, 'live_class', l.id, l.course_id, l.title, l.platform, c.name
+        FROM "Live_class" l LEFT JOIN "Course" c ON c.id = l.course_id
+    """)
+
+
+def upgrade():
+    _register_inflate()
+
+    # search_index kept a second, uncompressed copy of every extracted text.
+    # Move the text to an external content table that reads it back from
+    # Material_text, and rebuild search_index without its content column.
+    op.execute("DROP TABLE search_index")
+    _create_search_index("kind UNINDEXED, ref_id UNINDEXED, course_id UNINDEXED, title, body, subject")
+
+    op.execute('CREATE VIEW search_text_source AS SELECT material_id, inflate(content) AS content FROM "Material_text"')
+    op.execute("""
+        CREATE VIRTUAL TABLE search_text USING fts5(
+            content,
+            content = 'search_text_source', content_rowid = 'material_id',
+            tokenize = 'porter unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )
+    """)
+    op.execute("INSERT INTO search_text(search_text) VALUES ('rebuild')")
+
+
+def downgrade():
+    _register_inflate()
+
+    op.execute("DROP TABLE search_text")
+    op.execute("DROP VIEW search_text_source")
+
+    op.execute("DROP TABLE search_index")
+    _create_search_index("kind UNINDEXED, ref_id UNINDEXED, course_id UNINDEXED, title, body, subject, content")
+    op.execute("""
+        UPDATE search_index SET content = (
+            SELECT inflate(t.content) FROM "Material_text" t WHERE t.material_id * 4 + 1 = search_index.rowid)
+        WHERE kind = 'material'
+    """)
@@ -8,12 +8,18 @@ class Student(db.Model):
     parent_id = db.Column(db.Integer, db.ForeignKey('Parent.id', name='fk_student_parent'))
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(100), unique=True, nullable=False)
-    password = db.Column(db.String(100), nullable=False)
+    password = db.Column(db.String(255), nullable=False)
     age = db.Column(db.Integer, nullable=False)
     grade = db.Column(db.String(10), nullable=False)
     course_id = db.Column(db.Integer, db.ForeignKey('Course.id', name='fk_student_course'))
     course = db.relationship("Course")
 
+    __table_args__ = (
+        # For the type-ahead's LIKE 'x%' fallback, see student_search.py
+        db.Index('ix_student_name_nocase', db.text('name COLLATE NOCASE')),
+        db.Index('ix_student_email_nocase', db.text('email COLLATE NOCASE')),
+    )
+
     def __repr__(self):
         return f'<Student {self.name}>'
 
@@ -23,7 +29,7 @@ class Teacher(db.Model):
     photo = db.Column(db.String(200), default='default.jpg')
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(100), unique=True, nullable=True)
-    password = db.Column(db.String(100), nullable=False)
+    password = db.Column(db.String(255), nullable=False)
     qualifications = db.Column(db.String(200), nullable=False)
     availability = db.Column(db.String(100), nullable=False)
     years_of_experience = db.Column(db.Integer, nullable=False)
@@ -42,7 +48,7 @@ class Parent(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(100), nullable=True)
-    password = db.Column(db.String(100), nullable=True)
+    password = db.Column(db.String(255), nullable=True)
     child_name = db.Column(db.String(100), nullable=True)
     relation_to_student = db.Column(db.String(50), nullable=True)
     address = db.Column(db.String(200), nullable=True)
@@ -53,7 +59,7 @@ class Parent(db.Model):
 class Login(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(100), unique=True, nullable=False)
-    password = db.Column(db.String(100), nullable=False)
+    password = db.Column(db.String(255), nullable=False)
     role = db.Column(db.String(50), nullable=False)  # e.g., 'student', 'teacher', 'parent'
     
 class Attendance(db.Model):
@@ -65,6 +71,11 @@ class Attendance(db.Model):
     status = db.Column(db.String(10), nullable=False)
     student = db.relationship('Student', backref='attendance_records')
     teacher = db.relationship('Teacher', backref='marked_attendance')
+
+    __table_args__ = (
+        db.Index('ix_attendance_student_date', 'student_id', 'date', unique=True),
+        {'sqlite_autoincrement': True},
+    )
     
 
 class Recorded_class(db.Model):
@@ -75,6 +86,7 @@ class Recorded_class(db.Model):
     title = db.Column(db.String(200), nullable=False)
     date = db.Column(db.Date, nullable=False)
     filename = db.Column(db.String(300), nullable=False)
+    size = db.Column(db.BigInteger, nullable=True)  # bytes on disk
 
     teacher = db.relationship('Teacher', backref=db.backref('recorded_classes', lazy='dynamic'))
     course = db.relationship('Course', backref=db.backref('recorded_classes', lazy='dynamic'))
@@ -90,10 +102,16 @@ class Live_class(db.Model):
     time = db.Column(db.Time, nullable=False)
     platform = db.Column(db.String(100), nullable=True)
     link = db.Column(db.String(300), nullable=False)
+    duration = db.Column(db.Integer, nullable=False, default=60, server_default='60')  # minutes
 
     teacher = db.relationship('Teacher', backref=db.backref('live_classes', lazy='dynamic'))
     course = db.relationship('Course', backref=db.backref('live_classes', lazy='dynamic'))
 
+    __table_args__ = (
+        db.Index('ix_live_class_teacher_start', 'teacher_id', 'date', 'time'),
+        db.Index('ix_live_class_course_start', 'course_id', 'date', 'time'),
+    )
+
     def __repr__(self):
         return f"<LiveClass {self.title}>"
     
@@ -121,8 +139,19 @@ class Studymaterial(db.Model):
     description = db.Column(db.Text, nullable=True)
     filename = db.Column(db.String(300), nullable=False)
     upload_date = db.Column(db.Date, nullable=False)
+    size = db.Column(db.BigInteger, nullable=True)  # bytes on disk
 
     teacher = db.relationship('Teacher', backref=db.backref('studymaterial', lazy=True))
+
+
+class Material_text(db.Model):
+    __tablename__ = 'Material_text'
+    material_id = db.Column(db.Integer, db.ForeignKey('Studymaterial.id'), primary_key=True)
+    status = db.Column(db.String(20), nullable=False)  # 'done', 'skipped', 'missing' or 'failed'
+    content = db.Column(db.LargeBinary, nullable=True)  # zlib-compressed UTF-8 text
+    extracted_at = db.Column(db.DateTime, nullable=False)
+
+    material = db.relationship('Studymaterial', backref=db.backref('text', uselist=False, cascade='all, delete-orphan'))
     
 class Progress(db.Model):
     __tablename__ = 'Progress'
@@ -130,9 +159,94 @@ class Progress(db.Model):
     student_id = db.Column(db.Integer, db.ForeignKey('Student.id'))
     material_id = db.Column(db.Integer, db.ForeignKey('Studymaterial.id'))
     viewed = db.Column(db.Boolean, default=False)
+    views = db.Column(db.Integer, nullable=False, default=1, server_default='1')  # times opened
 
     student = db.relationship("Student", backref="progress")
     material = db.relationship("Studymaterial", backref="views")
+
+    __table_args__ = (
+        db.Index('ix_progress_student_material', 'student_id', 'material_id', unique=True),
+        db.Index('ix_progress_material', 'material_id'),
+    )
+
+
+class Watch_event(db.Model):
+    # Append-only heartbeats from the recorded class player
+    __tablename__ = 'Watch_event'
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('Student.id'), nullable=False)
+    recorded_class_id = db.Column(db.Integer, db.ForeignKey('Recorded_class.id'), nullable=False)
+    position = db.Column(db.Integer, nullable=False)   # seconds into the video
+    start = db.Column(db.Integer, nullable=True)       # where the part played since the last beat began
+    duration = db.Column(db.Integer, nullable=True)    # video length reported by the player
+    created_at = db.Column(db.DateTime, nullable=False)
+
+
+class Watch_summary(db.Model):
+    # Per-student rollup of Watch_event
+    __tablename__ = 'Watch_summary'
+    student_id = db.Column(db.Integer, db.ForeignKey('Student.id'), primary_key=True)
+    recorded_class_id = db.Column(db.Integer, db.ForeignKey('Recorded_class.id'), primary_key=True)
+    buckets = db.Column(db.LargeBinary, nullable=False)  # bitmap of watched WATCH_BUCKET_SECONDS slots
+    watched_seconds = db.Column(db.Integer, nullable=False, default=0)
+    duration = db.Column(db.Integer, nullable=True)
+    percent = db.Column(db.Float, nullable=False, default=0)
+    last_watched_at = db.Column(db.DateTime, nullable=False)
+
+    student = db.relationship('Student')
+
+    __table_args__ = (
+        db.Index('ix_watch_summary_class', 'recorded_class_id'),
+    )
+
+
+class Video_engagement(db.Model):
+    # Per-video rollup of Watch_summary
+    __tablename__ = 'Video_engagement'
+    recorded_class_id = db.Column(db.Integer, db.ForeignKey('Recorded_class.id'), primary_key=True)
+    viewers = db.Column(db.Integer, nullable=False, default=0)
+    completed = db.Column(db.Integer, nullable=False, default=0)  # viewers past WATCH_COMPLETE_PERCENT
+    avg_percent = db.Column(db.Float, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False)
+
+
+class Material_engagement(db.Model):
+    # Per-material rollup of Progress, kept up to date by progress flushes
+    __tablename__ = 'Material_engagement'
+    material_id = db.Column(db.Integer, db.ForeignKey('Studymaterial.id'), primary_key=True)
+    views = db.Column(db.Integer, nullable=False, default=0)
+    viewers = db.Column(db.Integer, nullable=False, default=0)  # distinct students
+    updated_at = db.Column(db.DateTime, nullable=False)
+
+
+class Storage_usage(db.Model):
+    # Running totals of uploaded bytes, per teacher and per course
+    __tablename__ = 'Storage_usage'
+    scope = db.Column(db.String(10), primary_key=True)  # 'teacher' or 'course'
+    scope_id = db.Column(db.Integer, primary_key=True)
+    bytes = db.Column(db.BigInteger, nullable=False, default=0)
+    files = db.Column(db.Integer, nullable=False, default=0)
+
+
+class Job_state(db.Model):
+    # Cursors and other small state kept by background jobs
+    __tablename__ = 'Job_state'
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.String(200), nullable=True)
+    updated_at = db.Column(db.DateTime, nullable=False)
+
+
+class Scanner(db.Model):
+    # RFID/QR door scanners allowed to post attendance through the API
+    __tablename__ = 'Scanner'
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    token_hash = db.Column(db.String(64), unique=True, nullable=False)  # sha256 of the API token
+    course_id = db.Column(db.Integer, db.ForeignKey('Course.id'), nullable=True)  # None: any student
+    teacher_id = db.Column(db.Integer, db.ForeignKey('Teacher.id'), nullable=True)  # recorded as marker
+    active = db.Column(db.Boolean, nullable=False, default=True)
+    created_at = db.Column(db.DateTime, nullable=False)
+    last_seen_at = db.Column(db.DateTime, nullable=True)
     
 # class StudentSubjects(db.Model):
 #     __tablename__ = 'student_subjects'
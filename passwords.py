@@ -0,0 +1,82 @@
+import hmac
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Response
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# Prefixes of the hashes werkzeug produces; anything else is a password
+# stored before hashing was introduced
+HASH_PREFIXES = ('scrypt:', 'pbkdf2:')
+
+
+class PasswordsBusy(Exception):
+    """Too many hashes are being computed; the caller should answer 503."""
+
+
+def is_hashed(stored):
+    return bool(stored) and stored.startswith(HASH_PREFIXES)
+
+
+class Passwords:
+    """Hashes and checks passwords on a small thread pool.
+
+    scrypt and pbkdf2 release the GIL, so a few threads use a few cores
+    while request threads wait. At most PASSWORD_MAX_PENDING hashes may be
+    queued or running; past that, a call waits PASSWORD_WAIT_SECONDS for
+    room and then raises PasswordsBusy rather than letting a login burst
+    pile up behind the KDF.
+    """
+
+    def __init__(self):
+        self.app = None
+        self._executor = None
+        self._pending = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+        app.config.setdefault('PASSWORD_HASH_WORKERS', 4)
+        app.config.setdefault('PASSWORD_MAX_PENDING', 32)
+        app.config.setdefault('PASSWORD_WAIT_SECONDS', 2)
+        app.extensions['passwords'] = self
+        app.register_error_handler(PasswordsBusy, self._busy)
+
+    def _busy(self, exc):
+        return Response("The server is busy, please try again shortly.", status=503,
+                        headers={"Retry-After": str(self.app.config['PASSWORD_WAIT_SECONDS'])})
+
+    def _run(self, func, *args):
+        config = self.app.config
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=config['PASSWORD_HASH_WORKERS'],
+                                                    thread_name_prefix='passwords')
+                self._pending = threading.BoundedSemaphore(config['PASSWORD_MAX_PENDING'])
+        if not self._pending.acquire(timeout=config['PASSWORD_WAIT_SECONDS']):
+            raise PasswordsBusy()
+        try:
+            return self._executor.submit(func, *args).result()
+        finally:
+            self._pending.release()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.app.config['PASSWORD_HASH_METHOD'])
+
+    def verify(self, stored, password):
+        """Return (matches, needs_rehash).
+
+        needs_rehash is True when the password matched but is stored in
+        plaintext or with other parameters than PASSWORD_HASH_METHOD.
+        """
+        if not stored or not password:
+            return False, False
+        if not is_hashed(stored):
+            return hmac.compare_digest(stored.encode(), password.encode()), True
+        if not self._run(check_password_hash, stored, password):
+            return False, False
+        return True, stored.split('$', 1)[0] != self.app.config['PASSWORD_HASH_METHOD']
+
+
+passwords = Passwords()
@@ -0,0 +1,71 @@
+"""Column projections for listing pages.
+
+Listings only show a handful of columns, so instead of loading full model
+objects (identity map, change tracking, a lazy load per relationship) these
+select just those columns, with related names joined in. Run them with
+db.session.execute(...) or streaming.iter_rows(); rows are read-only named
+tuples, e.g. row.name, row.parent_name. See benchmarks/listing_rows.py.
+"""
+from sqlalchemy import select
+
+import archive
+from models import Student, Teacher, Parent, Course, Studymaterial, Recorded_class, Live_class
+
+
+def students():
+    return (select(Student.id, Student.name, Student.email, Student.age, Student.grade,
+                   Course.name.label('course_name'),
+                   Parent.name.label('parent_name'), Parent.contact.label('parent_contact'))
+            .outerjoin(Course, Student.course_id == Course.id)
+            .outerjoin(Parent, Student.parent_id == Parent.id)
+            .order_by(Student.id))
+
+
+def roster():
+    # Just enough to mark attendance
+    return select(Student.id, Student.name).order_by(Student.id)
+
+
+def teachers():
+    return (select(Teacher.id, Teacher.name, Teacher.email, Teacher.qualifications, Teacher.availability,
+                   Teacher.years_of_experience, Teacher.contact, Teacher.place,
+                   Course.name.label('course_name'))
+            .outerjoin(Course, Teacher.course_id == Course.id)
+            .order_by(Teacher.id))
+
+
+def parents():
+    return select(Parent.id, Parent.name, Parent.email, Parent.contact, Parent.child_name,
+                  Parent.relation_to_student, Parent.address).order_by(Parent.id)
+
+
+def materials(teacher_id):
+    return (select(Studymaterial.id, Studymaterial.subject, Studymaterial.title,
+                   Studymaterial.description, Studymaterial.filename)
+            .where(Studymaterial.teacher_id == teacher_id)
+            .order_by(Studymaterial.id))
+
+
+def recorded_classes(**filters):
+    # filters as for filter_by(), e.g. teacher_id=... or course_id=...
+    query = (select(Recorded_class.id, Recorded_class.title, Recorded_class.date, Recorded_class.filename,
+                    Course.name.label('course_name'))
+             .outerjoin(Course, Recorded_class.course_id == Course.id)
+             .order_by(Recorded_class.id))
+    return query.where(*(getattr(Recorded_class, name) == value for name, value in filters.items()))
+
+
+def live_classes(**filters):
+    query = (select(Live_class.id, Live_class.title, Live_class.date, Live_class.time, Live_class.link,
+                    Course.name.label('course_name'))
+             .outerjoin(Course, Live_class.course_id == Course.id)
+             .order_by(Live_class.id))
+    return query.where(*(getattr(Live_class, name) == value for name, value in filters.items()))
+
+
+def attendance(student_id):
+    # Includes rows moved to the attendance archive
+    source = archive.attendance_source()
+    return (select(source.c.date, source.c.status)
+            .where(source.c.student_id == student_id)
+            .order_by(source.c.date))
@@ -0,0 +1,102 @@
+from datetime import datetime, time, timedelta
+
+from flask import current_app
+from sqlalchemy import and_, or_, select
+
+from extensions import db
+from models import Live_class
+
+
+def _sessions(teacher_id, course_id, since, until, exclude_id=None):
+    """Live classes of the teacher or of the course on the days from
+    `since` to `until`, in start order, as (row, start, end).
+
+    Each side of the OR is a range on its own (owner, date, time) index,
+    so this reads those days' classes and nothing else.
+    """
+    window = and_(Live_class.date >= since.date(), Live_class.date <= until.date())
+    owners = [and_(Live_class.teacher_id == teacher_id, window)]
+    if course_id is not None:
+        owners.append(and_(Live_class.course_id == course_id, window))
+    query = select(Live_class.id, Live_class.title, Live_class.teacher_id, Live_class.course_id,
+                   Live_class.date, Live_class.time, Live_class.duration).where(or_(*owners))
+    if exclude_id is not None:
+        query = query.where(Live_class.id != exclude_id)
+    for row in db.session.execute(query.order_by(Live_class.date, Live_class.time)):
+        start = datetime.combine(row.date, row.time)
+        yield row, start, start + timedelta(minutes=row.duration)
+
+
+def lock_calendar():
+    """Take the database write lock before checking for conflicts, so no
+    other request can book the same slot between the check and the commit.
+    Held until the session commits or rolls back.
+
+    The driver only opens a transaction at the first write, so on SQLite a
+    session that has not written yet can start its own with BEGIN
+    IMMEDIATE; one that has already written holds the lock.
+    """
+    conn = db.session.connection()
+    if conn.dialect.name == 'sqlite' and not conn.connection.dbapi_connection.in_transaction:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def conflicts(teacher_id, course_id, start, duration, exclude_id=None):
+    """Classes of the teacher or the course that overlap `duration` minutes
+    from `start`. Pass exclude_id when moving an existing class.
+
+    No class runs longer than LIVE_CLASS_MAX_DURATION, so only those that
+    start at most that long before `start` can still be running then.
+    """
+    end = start + timedelta(minutes=duration)
+    since = start - timedelta(minutes=current_app.config['LIVE_CLASS_MAX_DURATION'])
+    return [row for row, row_start, row_end in _sessions(teacher_id, course_id, since, end, exclude_id)
+            if row_start < end and row_end > start]
+
+
+def next_free_slot(teacher_id, course_id, duration, after=None, exclude_id=None):
+    """The earliest start from `after` (default now) at which neither the
+    teacher nor the course has a class for `duration` minutes, between
+    LIVE_CLASS_DAY_START and LIVE_CLASS_DAY_END. None if there is no such
+    slot in the next LIVE_CLASS_SLOT_HORIZON_DAYS days.
+
+    Walks the classes in start order once, pushing the candidate past
+    each one it collides with, so it is a single query however busy the
+    calendar is.
+    """
+    config = current_app.config
+    length = timedelta(minutes=duration)
+    day_start = time.fromisoformat(config['LIVE_CLASS_DAY_START'])
+    day_end = time.fromisoformat(config['LIVE_CLASS_DAY_END'])
+    if datetime.combine(datetime.min, day_start) + length > datetime.combine(datetime.min, day_end):
+        return None
+
+    def fit(candidate):
+        # Move the candidate into the teaching day, or to the next morning
+        if candidate.time() < day_start:
+            candidate = datetime.combine(candidate.date(), day_start)
+        if candidate + length > datetime.combine(candidate.date(), day_end):
+            candidate = datetime.combine(candidate.date() + timedelta(days=1), day_start)
+        return candidate
+
+    after = after or datetime.now()
+    if after.second or after.microsecond:
+        after = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    until = after + timedelta(days=config['LIVE_CLASS_SLOT_HORIZON_DAYS'])
+    since = after - timedelta(minutes=config['LIVE_CLASS_MAX_DURATION'])
+
+    candidate = fit(after)
+    for _, start, end in _sessions(teacher_id, course_id, since, until, exclude_id):
+        if start >= candidate + length:
+            break
+        if end > candidate:
+            candidate = fit(end)
+    return candidate if candidate + length <= until else None
+
+
+def init_app(app):
+    app.config.setdefault('LIVE_CLASS_DEFAULT_DURATION', 60)
+    app.config.setdefault('LIVE_CLASS_MAX_DURATION', 240)
+    app.config.setdefault('LIVE_CLASS_DAY_START', '08:00')
+    app.config.setdefault('LIVE_CLASS_DAY_END', '20:00')
+    app.config.setdefault('LIVE_CLASS_SLOT_HORIZON_DAYS', 60)
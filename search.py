@@ -0,0 +1,187 @@
+import re
+import zlib
+
+import click
+from flask.cli import with_appcontext
+from markupsafe import escape, Markup
+from sqlalchemy import event, text
+
+from extensions import db
+from models import Material_text
+
+# search_index is an FTS5 table kept in sync by triggers on Studymaterial,
+# Recorded_class and Live_class (see migration 3a7c91e4d2b8). Text extracted
+# from material files is indexed in search_text, an external content FTS5
+# table over Material_text (see migration 7c2e5a9f1d46): it holds only the
+# index, and snippets read the compressed text back through inflate(), so
+# the text is stored once. It is kept in sync by index_text() and the
+# Material_text delete hook below.
+
+MAX_TERMS = 8
+MAX_PAGE = 50
+
+# Column weights for bm25(): kind, ref_id, course_id, title, body, subject
+RANK = "bm25(search_index, 0, 0, 0, 10.0, 1.0, 3.0)"
+TEXT_RANK = "bm25(search_text, 0.5)"
+
+# Control characters never show up in indexed text, so they are safe markers
+# to put around matches before escaping the snippet for HTML.
+_OPEN, _CLOSE = "\x02", "\x03"
+
+REINDEX_SQL = [
+    "DELETE FROM search_index",
+    """INSERT INTO search_index(rowid, kind, ref_id, course_id, title, body, subject)
+       SELECT m.id * 4 + 1, 'material', m.id, t.course_id, m.title, m.description, m.subject
+       FROM "Studymaterial" m LEFT JOIN "Teacher" t ON t.id = m.teacher_id""",
+    """INSERT INTO search_index(rowid, kind, ref_id, course_id, title, body, subject)
+       SELECT r.id * 4 + 2, 'recorded_class', r.id, r.course_id, r.title, '', c.name
+       FROM "Recorded_class" r LEFT JOIN "Course" c ON c.id = r.course_id""",
+    """INSERT INTO search_index(rowid, kind, ref_id, course_id, title, body, subject)
+       SELECT l.id * 4 + 3, 'live_class', l.id, l.course_id, l.title, l.platform, c.name
+       FROM "Live_class" l LEFT JOIN "Course" c ON c.id = l.course_id""",
+]
+
+
+INSERT_TEXT_SQL = "INSERT INTO search_text(rowid, content) VALUES (:rowid, :content)"
+DELETE_TEXT_SQL = "INSERT INTO search_text(search_text, rowid, content) VALUES ('delete', :rowid, :content)"
+
+
+def inflate(value):
+    # Registered as an SQL function; search_text_source uses it on Material_text.content
+    return zlib.decompress(value).decode('utf-8') if value else None
+
+
+def index_text(material_id, old_content, new_content):
+    """Replace a material's terms in search_text. Both contents are the
+    compressed Material_text values; an external content table needs the
+    old text to know which terms to remove."""
+    if old_content:
+        db.session.execute(text(DELETE_TEXT_SQL), {"rowid": material_id, "content": inflate(old_content)})
+    if new_content:
+        db.session.execute(text(INSERT_TEXT_SQL), {"rowid": material_id, "content": inflate(new_content)})
+
+
+@event.listens_for(Material_text, 'before_delete')
+def _unindex_deleted_text(mapper, connection, target):
+    # Material_text rows go when their material is deleted
+    if target.content:
+        connection.execute(text(DELETE_TEXT_SQL), {"rowid": target.material_id, "content": inflate(target.content)})
+
+
+def _terms(query):
+    # Every word becomes a quoted prefix term, so user input can never be
+    # parsed as FTS syntax.
+    return [f'"{term}"*' for term in re.findall(r"\w+", query or "")[:MAX_TERMS]]
+
+
+def build_match(query):
+    # Turn free text into a safe FTS5 expression matching all the terms
+    return " ".join(_terms(query))
+
+
+def _highlight(value):
+    value = str(escape(value or ""))
+    return Markup(value.replace(_OPEN, "<mark>").replace(_CLOSE, "</mark>"))
+
+
+def _docs_with(param):
+    # Documents with the term in their title, description and subject or in their file's text
+    return (f"SELECT doc FROM (SELECT rowid AS doc FROM search_index WHERE search_index MATCH :{param} "
+            f"UNION SELECT rowid * 4 + 1 FROM search_text WHERE search_text MATCH :{param})")
+
+
+def search(query, course_id=None, page=1, per_page=20):
+    """Ranked search over materials and classes.
+
+    Returns (results, has_next). Classes and materials are limited to
+    course_id when given. A material matches when every term is in its
+    title, description, subject or file text.
+
+    Documents are scored on the bm25 of both tables and paged by rowid
+    first; titles and snippets are only worked out for the page, since
+    a snippet from the file text means inflating it.
+    """
+    terms = _terms(query)
+    if not terms:
+        return [], False
+
+    page = max(1, min(page, MAX_PAGE))
+    params = {f"term{i}": term for i, term in enumerate(terms)}
+    # With one term every hit matches; with more, a hit must have each of them somewhere
+    matched = "" if len(terms) == 1 else \
+        "WHERE h.doc IN (" + " INTERSECT ".join(_docs_with(name) for name in params) + ")"
+    sql = f"""
+        WITH hits AS (
+            SELECT rowid AS doc, {RANK} AS rank FROM search_index
+            WHERE search_index MATCH :any
+              {"AND course_id = :course_id" if course_id is not None else ""}
+            UNION ALL
+            SELECT rowid * 4 + 1, {TEXT_RANK} FROM search_text WHERE search_text MATCH :any
+        ),
+        page AS (
+            SELECT h.doc, SUM(h.rank) AS rank FROM hits h
+            {matched}
+            GROUP BY h.doc
+            {"HAVING (SELECT course_id FROM search_index WHERE rowid = h.doc) = :course_id" if course_id is not None else ""}
+            ORDER BY rank
+            LIMIT :limit OFFSET :offset
+        )
+        SELECT s.kind, s.ref_id, s.subject,
+               COALESCE((SELECT highlight(search_index, 3, :open, :close) FROM search_index
+                         WHERE search_index MATCH :any AND rowid = p.doc), s.title) AS title,
+               -- Prefer a passage from the file over the description
+               COALESCE((SELECT snippet(search_text, 0, :open, :close, '…', 16) FROM search_text
+                         WHERE search_text MATCH :any AND rowid = (p.doc - 1) / 4 AND p.doc % 4 = 1),
+                        (SELECT snippet(search_index, -1, :open, :close, '…', 16) FROM search_index
+                         WHERE search_index MATCH :any AND rowid = p.doc)) AS snippet
+        FROM page p JOIN search_index s ON s.rowid = p.doc
+        ORDER BY p.rank
+    """
+    rows = db.session.execute(text(sql), {
+        **params,
+        "any": " OR ".join(terms),
+        "course_id": course_id,
+        "open": _OPEN,
+        "close": _CLOSE,
+        "limit": per_page + 1,
+        "offset": (page - 1) * per_page,
+    }).all()
+
+    results = [{
+        "kind": row.kind,
+        "id": row.ref_id,
+        "title": _highlight(row.title),
+        "snippet": _highlight(row.snippet),
+        "subject": row.subject,
+    } for row in rows[:per_page]]
+    return results, len(rows) > per_page
+
+
+def reindex():
+    for statement in REINDEX_SQL:
+        db.session.execute(text(statement))
+
+    db.session.execute(text("INSERT INTO search_text(search_text) VALUES ('rebuild')"))
+
+    db.session.execute(text("INSERT INTO search_index(search_index) VALUES ('optimize')"))
+    db.session.execute(text("INSERT INTO search_text(search_text) VALUES ('optimize')"))
+    db.session.commit()
+
+
+@click.command("search-reindex")
+@with_appcontext
+def reindex_command():
+    """Rebuild the full-text search index from the database."""
+    reindex()
+    click.echo("Search index rebuilt.")
+
+
+def init_app(app):
+    app.cli.add_command(reindex_command)
+
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, 'connect')
+    def register_inflate(dbapi_connection, connection_record):
+        dbapi_connection.create_function('inflate', 1, inflate, deterministic=True)
@@ -0,0 +1,114 @@
+import os
+import sqlite3
+import tempfile
+import time
+
+import click
+from flask import current_app, g
+from flask.cli import with_appcontext
+from sqlalchemy import create_engine
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import NullPool
+
+from extensions import db
+from jobs import scheduler
+
+
+class Snapshot:
+    """Read-only copy of the database for heavy reports.
+
+    The copy is refreshed with SQLite's online backup API into a temporary
+    file that then replaces the old snapshot, so readers always see a
+    complete copy. The engine opens a new connection per checkout, which
+    picks up the latest file; report queries run there and never hold locks
+    on the database that attendance is written to.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.engine = None
+        self.session = None
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault('SNAPSHOT_PATH', os.path.join(app.instance_path, 'snapshot.db'))
+        app.config.setdefault('SNAPSHOT_INTERVAL', 300)
+        app.config.setdefault('SNAPSHOT_MAX_AGE', 3600)
+        app.config.setdefault('SNAPSHOT_BACKUP_PAGES', -1)
+        app.extensions['snapshot'] = self
+
+        path = app.config['SNAPSHOT_PATH']
+        self.engine = create_engine(f"sqlite:///file:{path}?mode=ro&uri=true", poolclass=NullPool)
+        self.session = scoped_session(sessionmaker(bind=self.engine))
+
+        app.teardown_appcontext(self._remove_session)
+        app.after_request(self._add_age_header)
+        scheduler.add('snapshot-refresh', app.config['SNAPSHOT_INTERVAL'], self.refresh)
+        app.cli.add_command(refresh_command)
+
+    def _remove_session(self, exc=None):
+        self.session.remove()
+
+    def _add_age_header(self, response):
+        age = g.pop('snapshot_age', None)
+        if age is not None:
+            response.headers['X-Snapshot-Age'] = str(int(age))
+        return response
+
+    def age(self):
+        """Seconds since the snapshot was taken, or None if there is none."""
+        try:
+            return max(0.0, time.time() - os.path.getmtime(self.app.config['SNAPSHOT_PATH']))
+        except OSError:
+            return None
+
+    def refresh(self, force=False):
+        config = self.app.config
+        path = config['SNAPSHOT_PATH']
+        # Every worker runs the job; skip if another one refreshed recently
+        age = self.age()
+        if not force and age is not None and age < config['SNAPSHOT_INTERVAL'] / 2:
+            return False
+
+        folder = os.path.dirname(path)
+        os.makedirs(folder, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix='.snapshot-', suffix='.db', dir=folder)
+        os.close(fd)
+        started = time.monotonic()
+        try:
+            source = sqlite3.connect(db.engine.url.database)
+            target = sqlite3.connect(tmp_path)
+            try:
+                source.backup(target, pages=config['SNAPSHOT_BACKUP_PAGES'])
+                # A WAL-mode copy can't be opened read-only without its -shm file
+                target.execute("PRAGMA journal_mode = DELETE")
+            finally:
+                target.close()
+                source.close()
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        current_app.logger.info("Database snapshot refreshed in %.2fs", time.monotonic() - started)
+        return True
+
+    def reader(self):
+        """Session for report queries: the snapshot if it is fresh enough,
+        otherwise the primary database session."""
+        age = self.age()
+        if age is None or age > self.app.config['SNAPSHOT_MAX_AGE']:
+            return db.session
+        g.snapshot_age = age
+        return self.session
+
+
+snapshot = Snapshot()
+
+
+@click.command("snapshot-refresh")
+@with_appcontext
+def refresh_command():
+    """Take a fresh read-only snapshot of the database."""
+    snapshot.refresh(force=True)
+    click.echo(f"Snapshot written to {current_app.config['SNAPSHOT_PATH']}.")
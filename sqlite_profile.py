@@ -0,0 +1,108 @@
+import os
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import event
+
+from extensions import db
+from jobs import scheduler
+
+# Applied in this order to every new connection to the main database
+DEFAULT_PRAGMAS = {
+    'busy_timeout': 5000,             # ms to wait for a lock instead of failing
+    'journal_mode': 'WAL',            # readers don't block the writer and vice versa
+    'synchronous': 'NORMAL',          # safe with WAL; fsync on checkpoint only
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,         # negative means KiB
+    'temp_store': 'MEMORY',
+}
+
+
+def apply_pragmas(dbapi_connection, pragmas):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+    finally:
+        cursor.close()
+
+
+def checkpoint():
+    """Copy the WAL back into the database file.
+
+    A passive checkpoint never waits on readers or writers. Once the WAL has
+    grown past SQLITE_WAL_TRUNCATE_BYTES a truncating one runs instead,
+    which waits for readers to finish and shrinks the file back to zero.
+    """
+    config = current_app.config
+    wal_path = db.engine.url.database + '-wal'
+    try:
+        wal_size = os.path.getsize(wal_path)
+    except OSError:
+        return None
+    mode = 'TRUNCATE' if wal_size > config['SQLITE_WAL_TRUNCATE_BYTES'] else 'PASSIVE'
+    with db.engine.connect() as conn:
+        busy, log_pages, checkpointed = conn.exec_driver_sql(f"PRAGMA wal_checkpoint({mode})").one()
+    if busy:
+        current_app.logger.info("WAL checkpoint (%s) could not finish: %s of %s pages copied",
+                                mode, checkpointed, log_pages)
+    return mode, log_pages, checkpointed
+
+
+def check_integrity(full=False):
+    """Return the problems SQLite reports, or [] if the database is fine."""
+    pragma = 'integrity_check' if full else 'quick_check'
+    with db.engine.connect() as conn:
+        rows = [row[0] for row in conn.exec_driver_sql(f"PRAGMA {pragma}")]
+        conn.exec_driver_sql("PRAGMA optimize")
+    return [] if rows == ['ok'] else rows
+
+
+def run_check():
+    problems = check_integrity()
+    for problem in problems:
+        current_app.logger.error("SQLite quick_check: %s", problem)
+
+
+@click.command("sqlite-check")
+@click.option("--full", is_flag=True, help="Run integrity_check instead of quick_check.")
+@with_appcontext
+def check_command(full):
+    """Check the database file for corruption."""
+    problems = check_integrity(full)
+    for problem in problems:
+        click.echo(problem)
+    click.echo(f"{len(problems)} problems found." if problems else "ok")
+
+
+@click.command("sqlite-checkpoint")
+@with_appcontext
+def checkpoint_command():
+    """Checkpoint and truncate the write-ahead log."""
+    with db.engine.connect() as conn:
+        busy, log_pages, checkpointed = conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)").one()
+    click.echo(f"Checkpointed {checkpointed} of {log_pages} pages" + (" (busy)" if busy else "") + ".")
+
+
+def init_app(app):
+    app.config.setdefault('SQLITE_PRAGMAS', DEFAULT_PRAGMAS)
+    app.config.setdefault('SQLITE_CHECKPOINT_INTERVAL', 60)
+    app.config.setdefault('SQLITE_WAL_TRUNCATE_BYTES', 64 * 1024 * 1024)
+    app.config.setdefault('SQLITE_CHECK_INTERVAL', 24 * 60 * 60)
+
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name != 'sqlite':
+        return
+
+    pragmas = app.config['SQLITE_PRAGMAS']
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        apply_pragmas(dbapi_connection, pragmas)
+
+    scheduler.add('sqlite-checkpoint', app.config['SQLITE_CHECKPOINT_INTERVAL'], checkpoint)
+    scheduler.add('sqlite-check', app.config['SQLITE_CHECK_INTERVAL'], run_check)
+    app.cli.add_command(check_command)
+    app.cli.add_command(checkpoint_command)
@@ -0,0 +1,51 @@
+// Type-ahead for student listings. Give an input data-student-search="<search url>"
+// and list="<datalist id>", and each table row id="student-<id>"; picking a
+// suggestion scrolls to that student's row.
+(function () {
+  document.querySelectorAll("input[data-student-search]").forEach(function (input) {
+    var list = document.getElementById(input.getAttribute("list"));
+    var found = {};   // suggestion text -> student id
+    var timer = null;
+    var controller = null;
+
+    input.addEventListener("input", function () {
+      if (found[input.value]) {
+        show(found[input.value]);
+        return;
+      }
+      clearTimeout(timer);
+      timer = setTimeout(suggest, 150);
+    });
+
+    function suggest() {
+      var q = input.value.trim();
+      if (controller) controller.abort();
+      if (!q) {
+        list.innerHTML = "";
+        return;
+      }
+      controller = new AbortController();
+      fetch(input.dataset.studentSearch + "?q=" + encodeURIComponent(q), { signal: controller.signal })
+        .then(function (response) { return response.json(); })
+        .then(function (body) {
+          list.innerHTML = "";
+          found = {};
+          body.data.forEach(function (student) {
+            var option = document.createElement("option");
+            option.value = student.name + " (" + student.email + ")";
+            found[option.value] = student.id;
+            list.appendChild(option);
+          });
+        })
+        .catch(function () {});   // aborted by a newer keystroke
+    }
+
+    function show(id) {
+      var row = document.getElementById("student-" + id);
+      if (!row) return;
+      row.scrollIntoView({ block: "center" });
+      row.classList.add("search-hit");
+      setTimeout(function () { row.classList.remove("search-hit"); }, 2000);
+    }
+  });
+})();
@@ -0,0 +1,283 @@
+import heapq
+import os
+import time
+from datetime import datetime
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from extensions import db
+from jobs import scheduler
+from models import Studymaterial, Recorded_class, Teacher, Job_state, Storage_usage
+
+# Upload folders and the column that references files in each of them
+STORES = {
+    'materials': ('MATERIAL_FOLDER', Studymaterial.filename),
+    'videos': ('UPLOAD_FOLDER_VIDEOS', Recorded_class.filename),
+    'photos': ('UPLOAD_FOLDER_PHOTOS', Teacher.photo),
+}
+
+# Files that are shipped with the app rather than uploaded
+KEEP = {'default.jpg'}
+
+
+def _get_state(name):
+    state = db.session.get(Job_state, name)
+    return state.value if state else None
+
+
+def _set_state(name, value):
+    state = db.session.get(Job_state, name) or Job_state(name=name)
+    state.value = value
+    state.updated_at = datetime.now()
+    db.session.add(state)
+
+
+def _referenced(column, names):
+    if not names:
+        return set()
+    return {row[0] for row in db.session.query(column).filter(column.in_(names))}
+
+
+def scan_orphans(kind, batch_size, min_age, dry_run=False):
+    """Check the next batch of files in one upload folder against the database.
+
+    The position in the folder is kept in Job_state, so each call only looks
+    at batch_size files and a full pass is spread over many calls. Only the
+    next batch_size names after the cursor are kept while the folder is
+    listed, so a call needs no more memory than its batch. A dry run
+    checks the whole folder and moves nothing. Files younger than min_age
+    seconds are skipped: uploads are saved before their row is committed.
+    Returns the orphaned filenames found.
+    """
+    folder_key, column = STORES[kind]
+    folder = current_app.config[folder_key]
+    cursor_name = f'storage_scan:{kind}'
+    cursor = '' if dry_run else _get_state(cursor_name) or ''
+    if dry_run:
+        batch_size = None
+
+    with os.scandir(folder) as entries:
+        names = (e.name for e in entries if e.is_file() and e.name > cursor)
+        # One name past the batch tells whether the folder goes on after it
+        names = sorted(names) if batch_size is None else heapq.nsmallest(batch_size + 1, names)
+    batch = names[:batch_size]
+
+    now = time.time()
+    candidates = [n for n in batch if n not in KEEP
+                  and now - os.path.getmtime(os.path.join(folder, n)) > min_age]
+    orphans = sorted(set(candidates) - _referenced(column, candidates))
+
+    if not dry_run:
+        for name in orphans:
+            quarantine(kind, folder, name)
+        # Start over from the top once the end of the folder is reached
+        _set_state(cursor_name, batch[-1] if len(names) > len(batch) else '')
+        db.session.commit()
+    return orphans
+
+
+def quarantine(kind, folder, name):
+    target_dir = os.path.join(current_app.config['STORAGE_QUARANTINE_FOLDER'], kind)
+    os.makedirs(target_dir, exist_ok=True)
+    target = os.path.join(target_dir, f"{int(time.time())}__{name}")
+    try:
+        os.replace(os.path.join(folder, name), target)
+    except FileNotFoundError:  # another worker got there first
+        return
+    current_app.logger.info("Quarantined orphaned %s file %s", kind, name)
+
+
+def purge_quarantine(max_age_days):
+    root = current_app.config['STORAGE_QUARANTINE_FOLDER']
+    cutoff = time.time() - max_age_days * 24 * 60 * 60
+    removed = 0
+    for kind in STORES:
+        folder = os.path.join(root, kind)
+        if not os.path.isdir(folder):
+            continue
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                stamp = entry.name.split('__', 1)[0]
+                if entry.is_file() and stamp.isdigit() and int(stamp) < cutoff:
+                    os.remove(entry.path)
+                    removed += 1
+    return removed
+
+
+def scan_dangling(kind, batch_size):
+    """Return (table id, filename) pairs for the next batch of rows whose file
+    is missing from disk. Also resumes from a cursor kept in Job_state."""
+    folder_key, column = STORES[kind]
+    folder = current_app.config[folder_key]
+    model = column.class_
+    cursor_name = f'storage_refs:{kind}'
+    cursor = int(_get_state(cursor_name) or 0)
+
+    rows = db.session.query(model.id, column) \
+        .filter(model.id > cursor).order_by(model.id).limit(batch_size).all()
+    missing = [(row_id, name) for row_id, name in rows
+               if name and name not in KEEP and not os.path.isfile(os.path.join(folder, name))]
+
+    _set_state(cursor_name, str(rows[-1][0]) if len(rows) == batch_size else '0')
+    db.session.commit()
+    return missing
+
+
+def reconcile():
+    config = current_app.config
+    for kind in STORES:
+        scan_orphans(kind, config['STORAGE_SCAN_BATCH'], config['STORAGE_MIN_AGE'])
+        for row_id, name in scan_dangling(kind, config['STORAGE_SCAN_BATCH']):
+            current_app.logger.warning("%s row %s points at missing file %s", kind, row_id, name)
+    purge_quarantine(config['STORAGE_QUARANTINE_DAYS'])
+
+
+@click.command("storage-reconcile")
+@click.option("--dry-run", is_flag=True, help="Only report, don't move anything.")
+@with_appcontext
+def reconcile_command(dry_run):
+    """Walk the upload folders in full, quarantining orphaned files and
+    reporting rows that point at missing files."""
+    config = current_app.config
+    for kind in STORES:
+        # The cursor wraps to '' at the end of a pass
+        for name in _full_pass(kind, dry_run):
+            click.echo(f"orphan    {kind}/{name}")
+
+        _set_state(f'storage_refs:{kind}', '0')
+        while True:
+            for row_id, name in scan_dangling(kind, config['STORAGE_SCAN_BATCH']):
+                click.echo(f"dangling  {kind} id={row_id} {name}")
+            if _get_state(f'storage_refs:{kind}') == '0':
+                break
+
+    if not dry_run:
+        click.echo(f"Purged {purge_quarantine(config['STORAGE_QUARANTINE_DAYS'])} quarantined files.")
+
+
+def _full_pass(kind, dry_run):
+    config = current_app.config
+    if dry_run:
+        return scan_orphans(kind, None, config['STORAGE_MIN_AGE'], dry_run=True)
+    _set_state(f'storage_scan:{kind}', '')
+    found = []
+    while True:
+        found += scan_orphans(kind, config['STORAGE_SCAN_BATCH'], config['STORAGE_MIN_AGE'])
+        if not _get_state(f'storage_scan:{kind}'):
+            return found
+
+
+# --- Usage and quotas ---
+
+def _add_usage(scope, scope_id, size, files):
+    stmt = sqlite_insert(Storage_usage).values(scope=scope, scope_id=scope_id, bytes=size, files=files)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['scope', 'scope_id'],
+        set_={'bytes': Storage_usage.bytes + stmt.excluded.bytes,
+              'files': Storage_usage.files + stmt.excluded.files},
+    )
+    db.session.execute(stmt)
+
+
+def record_usage(teacher_id, course_id, size):
+    # Call in the same transaction that adds the row for the file
+    _add_usage('teacher', teacher_id, size, 1)
+    if course_id:
+        _add_usage('course', course_id, size, 1)
+
+
+def release_usage(teacher_id, course_id, size):
+    if size is None:
+        return
+    _add_usage('teacher', teacher_id, -size, -1)
+    if course_id:
+        _add_usage('course', course_id, -size, -1)
+
+
+def usage(scope, scope_id):
+    row = db.session.get(Storage_usage, (scope, scope_id))
+    return row.bytes if row else 0
+
+
+def check_quota(teacher_id, course_id, incoming):
+    """Return an error message if storing `incoming` more bytes would go
+    over the teacher's or the course's quota, else None."""
+    config = current_app.config
+    for scope, scope_id, limit in (('teacher', teacher_id, config['STORAGE_TEACHER_QUOTA']),
+                                   ('course', course_id, config['STORAGE_COURSE_QUOTA'])):
+        if limit is None or scope_id is None:
+            continue
+        used = usage(scope, scope_id)
+        if used + incoming > limit:
+            return (f"This upload would exceed the {scope} storage quota "
+                    f"({format_size(used)} of {format_size(limit)} used).")
+    return None
+
+
+def format_size(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
+
+
+@click.command("storage-recount")
+@with_appcontext
+def recount_command():
+    """Re-read file sizes from disk and rebuild the usage totals."""
+    config = current_app.config
+    for model, folder_key in ((Studymaterial, 'MATERIAL_FOLDER'), (Recorded_class, 'UPLOAD_FOLDER_VIDEOS')):
+        for row in model.query.yield_per(500):
+            row.size = file_size(os.path.join(config[folder_key], row.filename))
+        db.session.flush()
+
+    Storage_usage.query.delete()
+    material_course = db.session.query(Teacher.course_id).filter(Teacher.id == Studymaterial.teacher_id).scalar_subquery()
+    totals = [
+        db.session.query(Studymaterial.teacher_id, func.sum(Studymaterial.size), func.count())
+        .filter(Studymaterial.size.isnot(None)).group_by(Studymaterial.teacher_id),
+        db.session.query(Recorded_class.teacher_id, func.sum(Recorded_class.size), func.count())
+        .filter(Recorded_class.size.isnot(None)).group_by(Recorded_class.teacher_id),
+    ]
+    for query in totals:
+        for teacher_id, size, files in query:
+            _add_usage('teacher', teacher_id, size, files)
+
+    course_totals = [
+        db.session.query(material_course, func.sum(Studymaterial.size), func.count())
+        .filter(Studymaterial.size.isnot(None)).group_by(material_course),
+        db.session.query(Recorded_class.course_id, func.sum(Recorded_class.size), func.count())
+        .filter(Recorded_class.size.isnot(None)).group_by(Recorded_class.course_id),
+    ]
+    for query in course_totals:
+        for course_id, size, files in query:
+            if course_id is not None:
+                _add_usage('course', course_id, size, files)
+
+    db.session.commit()
+    for row in Storage_usage.query.order_by(Storage_usage.scope, Storage_usage.scope_id):
+        click.echo(f"{row.scope:8} {row.scope_id:>6} {format_size(row.bytes):>10} {row.files:>6} files")
+
+
+def init_app(app):
+    app.config.setdefault('STORAGE_QUARANTINE_FOLDER', os.path.join(app.instance_path, 'quarantine'))
+    app.config.setdefault('STORAGE_QUARANTINE_DAYS', 7)
+    app.config.setdefault('STORAGE_SCAN_BATCH', 500)
+    app.config.setdefault('STORAGE_SCAN_INTERVAL', 300)
+    app.config.setdefault('STORAGE_MIN_AGE', 60 * 60)
+    app.config.setdefault('STORAGE_TEACHER_QUOTA', None)
+    app.config.setdefault('STORAGE_COURSE_QUOTA', None)
+    scheduler.add('storage-reconcile', app.config['STORAGE_SCAN_INTERVAL'], reconcile)
+    app.cli.add_command(reconcile_command)
+    app.cli.add_command(recount_command)
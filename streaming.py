@@ -0,0 +1,47 @@
+from flask import Response, current_app, stream_template
+
+
+def _coalesce(chunks, size):
+    # Jinja yields every text node and {{ }} on its own; group them so the
+    # server writes a few KB at a time instead of a few bytes
+    pending = []
+    length = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield ''.join(pending)
+            pending = []
+            length = 0
+    if pending:
+        yield ''.join(pending)
+
+
+def iter_rows(session, statement):
+    """Rows selected by statement, fetched STREAM_YIELD_PER at a time.
+
+    Nothing runs until the first row is needed, i.e. while the page is
+    streaming. By then the view's app context is gone and with it the
+    session the view saw, so pass the scoped session itself (db.session,
+    snapshot.reader()) and it resolves to the stream's own.
+    """
+    yield from session.execute(statement.execution_options(yield_per=current_app.config['STREAM_YIELD_PER']))
+
+
+def stream_page(template_name, **context):
+    """Render a template while the client reads it.
+
+    Pass rows as an iter_rows() iterator, ideally over a read_models
+    projection, and the page header goes out before
+    the rows are fetched and only one batch of rows is in memory at a time.
+    Templates must not call |length or test the iterator for truth; use
+    {% for %}...{% else %} for the empty case.
+    """
+    chunks = stream_template(template_name, **context)
+    return Response(_coalesce(chunks, current_app.config['STREAM_CHUNK_BYTES']), mimetype='text/html',
+                    headers={"X-Accel-Buffering": "no"})
+
+
+def init_app(app):
+    app.config.setdefault('STREAM_CHUNK_BYTES', 16 * 1024)
+    app.config.setdefault('STREAM_YIELD_PER', 500)
@@ -0,0 +1,150 @@
+import threading
+import time
+from bisect import bisect_left, insort
+
+from sqlalchemy import collate, select, union
+
+from extensions import db
+from models import Student
+
+
+def _keys(name, email):
+    # The whole name, each later word of it (so "smi" finds "John Smith") and the email
+    name = (name or '').lower()
+    keys = {name, (email or '').lower()}
+    keys.update(name.split()[1:])
+    keys.discard('')
+    return keys
+
+
+def _like_prefix(prefix):
+    return prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+
+def search_database(prefix, limit, course_id=None):
+    """Students whose name or email starts with `prefix`, straight from
+    the database. Both sides are LIKE 'x%' on a NOCASE index, so this is a
+    range scan; unlike the in-memory index it doesn't match later words
+    of a name."""
+    pattern = _like_prefix(prefix)
+    matches = union(
+        select(Student.id).where(Student.name.like(pattern, escape='\\')),
+        select(Student.id).where(Student.email.like(pattern, escape='\\')),
+    ).subquery()
+    query = select(Student.id, Student.name, Student.email, Student.course_id).where(Student.id.in_(select(matches)))
+    if course_id is not None:
+        query = query.where(Student.course_id == course_id)
+    return db.session.execute(query.order_by(collate(Student.name, 'NOCASE'), Student.id).limit(limit)).all()
+
+
+class StudentIndex:
+    """Type-ahead over student names and emails.
+
+    Keeps every lowercased key in one sorted list of (key, student id), so
+    a prefix query is a bisect to the first match and a walk forward until
+    the prefix stops matching or `limit` students are found. Built from
+    one query the first time it is used and then kept current with
+    update() after registrations and profile edits. Other worker processes
+    see those edits when their copy expires after STUDENT_SEARCH_TTL
+    seconds. While a rebuild is running, queries go to search_database().
+    """
+
+    def __init__(self):
+        self.app = None
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._entries = []        # sorted (key, student_id)
+        self._students = {}       # student_id -> (name, email, course_id)
+        self._expires = 0
+        self._generation = 0      # bumped by every update
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault('STUDENT_SEARCH_LIMIT', 10)
+        app.config.setdefault('STUDENT_SEARCH_MAX', 50)
+        app.config.setdefault('STUDENT_SEARCH_TTL', 600)
+        app.extensions['student_index'] = self
+
+    def _build(self):
+        with self._lock:
+            generation = self._generation
+        students = {}
+        entries = []
+        for student_id, name, email, course_id in db.session.execute(
+                select(Student.id, Student.name, Student.email, Student.course_id)):
+            students[student_id] = (name, email, course_id)
+            entries.extend((key, student_id) for key in _keys(name, email))
+        entries.sort()
+        with self._lock:
+            self._entries = entries
+            self._students = students
+            # If a student changed while we read, rebuild again on the next query
+            fresh = generation == self._generation
+            self._expires = time.monotonic() + self.app.config['STUDENT_SEARCH_TTL'] if fresh else 0
+
+    def _ready(self):
+        if self._expires > time.monotonic():
+            return True
+        if not self._build_lock.acquire(blocking=False):
+            return False
+        try:
+            if self._expires <= time.monotonic():
+                self._build()
+        finally:
+            self._build_lock.release()
+        return True
+
+    def search(self, prefix, limit=None, course_id=None):
+        """Up to `limit` students whose name, a word of their name, or
+        email starts with `prefix`, as (id, name, email, course_id)."""
+        prefix = (prefix or '').strip().lower()
+        limit = limit or self.app.config['STUDENT_SEARCH_LIMIT']
+        if not prefix:
+            return []
+        if not self._ready():
+            return search_database(prefix, limit, course_id)
+
+        found = []
+        seen = set()
+        with self._lock:
+            entries = self._entries
+            for index in range(bisect_left(entries, (prefix,)), len(entries)):
+                key, student_id = entries[index]
+                if not key.startswith(prefix):
+                    break
+                if student_id in seen:
+                    continue
+                seen.add(student_id)
+                name, email, student_course = self._students[student_id]
+                if course_id is not None and student_course != course_id:
+                    continue
+                found.append((student_id, name, email, student_course))
+                if len(found) >= limit:
+                    break
+        return found
+
+    def update(self, student_id, name, email, course_id):
+        """Re-key one student after it is added or edited."""
+        with self._lock:
+            self._generation += 1
+            if not self._expires:
+                return  # not built yet; the build will read it
+            old = self._students.get(student_id)
+            if old:
+                for key in _keys(old[0], old[1]):
+                    index = bisect_left(self._entries, (key, student_id))
+                    if index < len(self._entries) and self._entries[index] == (key, student_id):
+                        del self._entries[index]
+            self._students[student_id] = (name, email, course_id)
+            for key in _keys(name, email):
+                insort(self._entries, (key, student_id))
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._expires = 0
+            self._entries = []
+            self._students = {}
+
+
+student_index = StudentIndex()
@@ -0,0 +1,10 @@
+import importlib
+
+# Each area lives in its own module and is only imported by create_app()
+BLUEPRINTS = ('main', 'student', 'teacher', 'parent', 'admin', 'api')
+
+
+def register_blueprints(app):
+    for name in BLUEPRINTS:
+        module = importlib.import_module(f'views.{name}')
+        app.register_blueprint(module.bp)
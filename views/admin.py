@@ -0,0 +1,112 @@
+from flask import Blueprint, render_template, request, flash, redirect, url_for, g, current_app
+
+from extensions import db
+import read_models
+from streaming import iter_rows, stream_page
+from snapshot import snapshot
+from admission import admission
+import identity
+from student_search import student_index
+from models import Course
+
+bp = Blueprint('admin', __name__)
+
+
+@bp.route('/admin') 
+def admin_index():
+    return render_template("admin_index.html")
+
+
+@bp.route('/students')
+@admission.limit('report')
+def students():
+    reader = snapshot.reader()
+    all_students = iter_rows(reader, read_models.students())
+    return stream_page('student.html', students=all_students,
+                       snapshot_age=g.get('snapshot_age'))  # for admin
+
+
+@bp.route('/students/search')
+def search_students():
+    # Type-ahead for the student and attendance listings: ?q=<prefix>&limit=.
+    # Teachers only, and only their own course's students, as in /api/v1/students
+    teacher = identity.current('teacher')
+    if teacher is None:
+        return {"error": "teacher login required"}, 401
+    if teacher.course_id is None:
+        return {"data": []}
+    config = current_app.config
+    limit = max(1, min(request.args.get('limit', config['STUDENT_SEARCH_LIMIT'], type=int),
+                       config['STUDENT_SEARCH_MAX']))
+    students = student_index.search(request.args.get('q', ''), limit, teacher.course_id)
+    return {"data": [{"id": student_id, "name": name, "email": email}
+                     for student_id, name, email, _ in students]}
+
+
+@bp.route('/teachers')
+@admission.limit('report')
+def teachers():
+    reader = snapshot.reader()
+    all_teachers = iter_rows(reader, read_models.teachers())
+    return stream_page('teacher.html', teachers=all_teachers,
+                       snapshot_age=g.get('snapshot_age'))  # for admin
+
+
+@bp.route('/parents')
+@admission.limit('report')
+def parents():
+    reader = snapshot.reader()
+    all_parents = reader.execute(read_models.parents()).all()
+    return render_template('parent.html', students=all_parents,
+                           snapshot_age=g.get('snapshot_age'))  # for admin 
+
+
+@bp.route('/admin/snapshot')
+def snapshot_status():
+    age = snapshot.age()
+    return {"available": age is not None, "age_seconds": None if age is None else int(age),
+            "max_age_seconds": current_app.config['SNAPSHOT_MAX_AGE']}
+
+
+@bp.route('/add_subject', methods=['GET', 'POST'])
+def add_subject():
+    if request.method == 'POST':
+        subject_name = request.form.get('subject')
+        description = request.form.get('description')
+
+        # Check empty input
+        if not subject_name:
+            flash("Subject name cannot be empty!", "danger")
+            return redirect(url_for('admin.add_subject'))
+
+        # Save to DB
+        new_subject = Course(name=subject_name,
+                             description=description)
+        
+        db.session.add(new_subject)
+        db.session.commit()
+
+        flash("Subject added successfully!", "success")
+        return redirect(url_for('admin.add_subject'))
+
+    return render_template('add_subject.html') #for admin
+
+
+def add_courses():
+    courses_list = [
+        {"name": "Introduction to Robotics", "description": "Basics of Robotics"},
+        {"name": "Embedded Systems", "description": "Learn microcontrollers"},
+        {"name": "Artificial Intelligence", "description": "AI Concepts"},
+        {"name": "Machine Learning", "description": "ML Algorithms"},
+        {"name": "Python Programming", "description": "Learn Python"},
+        {"name": "IoT Applications", "description": "IoT Projects"},
+        {"name": "Computer Vision", "description": "CV Techniques"},
+        {"name": "Cloud Computing", "description": "Cloud Concepts"}
+    ]
+
+    for c in courses_list:
+        existing_course = Course.query.filter_by(name=c['name']).first()
+        if not existing_course:
+            db.session.add(Course(name=c['name'], description=c['description']))
+
+    db.session.commit()
@@ -0,0 +1,218 @@
+import json
+from datetime import date, datetime, time, timedelta
+
+from flask import Blueprint, request, current_app, session
+from sqlalchemy import select
+
+import archive
+import downloads
+import identity
+import ingest
+import scheduling
+from extensions import db
+from models import Student, Teacher, Studymaterial, Recorded_class, Live_class, Progress
+
+bp = Blueprint('api', __name__, url_prefix='/api/v1')
+
+
+@bp.record_once
+def _defaults(state):
+    state.app.config.setdefault('API_PAGE_SIZE', 50)
+    state.app.config.setdefault('API_PAGE_MAX', 200)
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+@bp.errorhandler(ApiError)
+def api_error(exc):
+    return {"error": str(exc)}, exc.status
+
+
+def _dumps_default(value):
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def compact_json(payload):
+    # No whitespace and raw UTF-8; the app's JSON provider pretty-prints in debug
+    body = json.dumps(payload, separators=(',', ':'), ensure_ascii=False, default=_dumps_default)
+    return current_app.response_class(body, mimetype='application/json')
+
+
+def _student_scope():
+    """Ids of the students whoever is logged in may see, as a subquery:
+    themselves, their children, or their course's students."""
+    if session.get('student_id'):
+        return select(Student.id).where(Student.id == session['student_id'])
+    if session.get('parent_id'):
+        return select(Student.id).where(Student.parent_id == session['parent_id'])
+    if session.get('teacher_id'):
+        course = select(Teacher.course_id).where(Teacher.id == session['teacher_id']).scalar_subquery()
+        return select(Student.id).where(Student.course_id == course)
+    raise ApiError(401, "login required")
+
+
+def _course_scope():
+    """Course ids of whoever is logged in, as a subquery."""
+    if session.get('student_id'):
+        return select(Student.course_id).where(Student.id == session['student_id'])
+    if session.get('parent_id'):
+        return select(Student.course_id).where(Student.parent_id == session['parent_id'])
+    if session.get('teacher_id'):
+        return select(Teacher.course_id).where(Teacher.id == session['teacher_id'])
+    raise ApiError(401, "login required")
+
+
+def listing(table, fields, default_fields, where, computed=None, newest_first=False):
+    """One page of rows from `table` as compact JSON.
+
+    fields names the columns a client may ask for with ?fields=a,b; only
+    those columns are selected. computed maps extra field names to
+    (columns needed, function of the row). Pages are keyed on id: pass the
+    previous page's next_cursor as ?cursor= to continue, which stays cheap
+    however deep the client scrolls and doesn't skip or repeat rows when
+    new ones are added.
+    """
+    computed = computed or {}
+    config = current_app.config
+    requested = request.args.get('fields')
+    names = [name.strip() for name in requested.split(',') if name.strip()] if requested else list(default_fields)
+    unknown = [name for name in names if name not in fields and name not in computed]
+    if unknown:
+        raise ApiError(400, f"unknown fields {', '.join(unknown)}; "
+                            f"choose from {', '.join(list(fields) + list(computed))}")
+    limit = max(1, min(request.args.get('limit', config['API_PAGE_SIZE'], type=int), config['API_PAGE_MAX']))
+
+    columns = ['id']
+    for name in names:
+        for column in computed[name][0] if name in computed else (name,):
+            if column not in columns:
+                columns.append(column)
+    query = select(*(table.c[name] for name in columns)).where(*where)
+    cursor = request.args.get('cursor', type=int)
+    if cursor is not None:
+        query = query.where(table.c.id < cursor if newest_first else table.c.id > cursor)
+    query = query.order_by(table.c.id.desc() if newest_first else table.c.id).limit(limit + 1)
+
+    rows = db.session.execute(query).all()
+    data = []
+    for row in rows[:limit]:
+        item = {}
+        for name in names:
+            item[name] = computed[name][1](row) if name in computed else getattr(row, name)
+        data.append(item)
+    return compact_json({"data": data,
+                         "next_cursor": str(rows[limit - 1].id) if len(rows) > limit else None})
+
+
+def _student_filter(table):
+    # Optional ?student_id= within what the viewer may see
+    where = [table.c.student_id.in_(_student_scope())]
+    student_id = request.args.get('student_id', type=int)
+    if student_id is not None:
+        where.append(table.c.student_id == student_id)
+    return where
+
+
+@bp.route('/students')
+def students():
+    table = Student.__table__
+    return listing(table, ('id', 'name', 'email', 'age', 'grade', 'course_id', 'parent_id'),
+                   ('id', 'name', 'grade'), [table.c.id.in_(_student_scope())])
+
+
+@bp.route('/classes/recorded')
+def recorded_classes():
+    table = Recorded_class.__table__
+    return listing(table, ('id', 'title', 'date', 'course_id', 'teacher_id', 'size'),
+                   ('id', 'title', 'date'), [table.c.course_id.in_(_course_scope())],
+                   computed={'url': (('filename',), lambda row: downloads.signed_url('videos', row.filename))},
+                   newest_first=True)
+
+
+@bp.route('/classes/live')
+def live_classes():
+    table = Live_class.__table__
+    return listing(table, ('id', 'title', 'date', 'time', 'duration', 'platform', 'link', 'course_id', 'teacher_id'),
+                   ('id', 'title', 'date', 'time', 'link'), [table.c.course_id.in_(_course_scope())],
+                   newest_first=True)
+
+
+@bp.route('/classes/live/next_free_slot')
+def next_free_slot():
+    # ?duration= in minutes and ?after= (ISO 8601, default now), for the
+    # logged-in teacher and their course
+    teacher = identity.current('teacher')
+    if teacher is None:
+        raise ApiError(401, "teacher login required")
+    config = current_app.config
+    duration = request.args.get('duration', config['LIVE_CLASS_DEFAULT_DURATION'], type=int)
+    if not 0 < duration <= config['LIVE_CLASS_MAX_DURATION']:
+        raise ApiError(400, f"duration must be between 1 and {config['LIVE_CLASS_MAX_DURATION']} minutes")
+    now = datetime.now()
+    after = now
+    if request.args.get('after'):
+        try:
+            after = datetime.fromisoformat(request.args['after'])
+        except ValueError:
+            raise ApiError(400, "after must be an ISO 8601 date and time")
+        if after.tzinfo is not None:
+            after = after.astimezone().replace(tzinfo=None)
+        after = max(after, now)
+
+    start = scheduling.next_free_slot(teacher.id, teacher.course_id, duration, after)
+    return compact_json({"start": start, "end": start + timedelta(minutes=duration) if start else None,
+                         "duration": duration})
+
+
+@bp.route('/materials')
+def materials():
+    table = Studymaterial.__table__
+    teachers = select(Teacher.id).where(Teacher.course_id.in_(_course_scope()))
+    return listing(table, ('id', 'subject', 'title', 'description', 'upload_date', 'size', 'teacher_id'),
+                   ('id', 'subject', 'title', 'upload_date'), [table.c.teacher_id.in_(teachers)],
+                   computed={'url': (('filename',), lambda row: downloads.signed_url('materials', row.filename))},
+                   newest_first=True)
+
+
+@bp.route('/attendance')
+def attendance():
+    # Includes rows moved to the attendance archive
+    table = archive.attendance_source()
+    return listing(table, ('id', 'student_id', 'teacher_id', 'date', 'status'),
+                   ('id', 'student_id', 'date', 'status'), _student_filter(table), newest_first=True)
+
+
+@bp.route('/progress')
+def progress():
+    table = Progress.__table__
+    return listing(table, ('id', 'student_id', 'material_id', 'viewed'),
+                   ('id', 'material_id', 'viewed'), _student_filter(table))
+
+
+@bp.route('/attendance/batch', methods=['POST'])
+def attendance_batch():
+    # Scanners send `Authorization: Bearer <token>` from `flask scanner-add`
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    scanner = ingest.scanner_for_token(token.strip()) if scheme.lower() == 'bearer' else None
+    if scanner is None:
+        return {"error": "invalid or missing scanner token"}, 401
+
+    data = request.get_json(silent=True)
+    events = data.get('events') if isinstance(data, dict) else data
+    if not isinstance(events, list):
+        return {"error": "expected a JSON list of events or {\"events\": [...]}"}, 400
+    limit = current_app.config['ATTENDANCE_BATCH_MAX']
+    if len(events) > limit:
+        return {"error": f"at most {limit} events per batch"}, 413
+
+    results = ingest.ingest_attendance(scanner, events)
+    counts = {}
+    for result in results:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+    return compact_json({"counts": counts, "results": results})
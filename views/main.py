@@ -0,0 +1,275 @@
+from flask import Blueprint, render_template, request, flash, redirect, url_for, session, Response, current_app
+from werkzeug.utils import secure_filename
+from flask_login import logout_user
+import os
+
+from extensions import db
+from events import broker
+import search
+import ingest
+import identity
+from identity import identities
+from student_search import student_index
+from admission import admission
+from passwords import passwords
+from models import Student, Teacher, Parent, Course
+
+bp = Blueprint('main', __name__)
+
+
+@bp.route('/')
+def home():
+    return render_template("index.html")
+
+
+@bp.route('/register', methods=['GET', 'POST'])
+def student_registration():
+    if request.method == 'POST':
+        name = request.form['name']
+        email = request.form['email']
+        password = request.form['password']
+        age = int(request.form['age'])
+        grade = request.form['grade']
+        course_id = request.form.get('course_id')  # dropdown sends subject_id
+
+        # Check if student already exists
+        exist = Student.query.filter_by(email=email).first()
+        if exist:
+            flash("User already exists", "danger")
+            return redirect(url_for('main.home'))
+
+        # Handle parent if student is under 18
+        parent_id = None
+        if age < 18:
+            parent_name = request.form['parent_name']
+            parent_contact = request.form['parent_contact']
+            parent = Parent(
+                name=parent_name,
+                contact=parent_contact,
+                email=None,
+                password=None,
+                child_name=name,
+                relation_to_student=None,
+                address=None
+            )
+            db.session.add(parent)
+            db.session.flush()  # get parent.id without committing
+            parent_id = parent.id
+
+        # Create new student
+        new_student = Student(
+            name=name,
+            email=email,
+            password=passwords.hash(password),
+            age=age,
+            grade=grade,
+            course_id=course_id,
+            parent_id=parent_id
+        )
+
+        db.session.add(new_student)
+        db.session.commit()
+        ingest.clear_rosters()
+        student_index.update(new_student.id, name, email, new_student.course_id)
+        # SQLite can hand out the id of a deleted row again
+        identities.invalidate('student', new_student.id)
+        if parent_id:
+            identities.invalidate('parent', parent_id)
+        return redirect(url_for('main.login'))
+
+    # GET request: fetch subjects from database
+    courses =Course.query.all()
+    return render_template("student_register.html", courses=courses)
+
+
+@bp.route('/teacher_register', methods=['GET', 'POST'])
+def teacher_registration():
+    courses = Course.query.all()
+    if request.method == 'POST':
+        course_id = request.form['course']
+        # Get form fields
+        name = request.form.get('name')
+        email = request.form.get('email')
+        password = request.form.get('password')
+        qualifications = request.form.get('qualifications')
+        availability = request.form.get('availability')
+        years_of_experience = request.form.get('years_of_experience')
+        contact = request.form.get('contact')
+        place = request.form.get('place')
+        
+        
+
+        # Handle photo upload
+        photo_file = request.files.get('photo')
+        if photo_file and photo_file.filename != "":
+            filename = secure_filename(photo_file.filename)
+            photo_file.save(os.path.join(current_app.config['UPLOAD_FOLDER_PHOTOS'], filename))
+        else:
+            filename = "default.jpg"
+
+        # Create teacher record
+        new_teacher = Teacher(
+            name=name,
+            email=email,
+            password=passwords.hash(password),
+            qualifications=qualifications,
+            course_id=course_id,
+            availability=availability,
+            years_of_experience=years_of_experience,
+            contact=contact,
+            place=place,
+            photo=filename
+        )
+
+        db.session.add(new_teacher)
+        db.session.commit()
+        identities.invalidate('teacher', new_teacher.id)
+        return redirect(url_for('main.login'))
+
+    return render_template("teacher_register.html",courses=courses)
+
+
+@bp.route('/parent_register', methods=['GET', 'POST'])
+def parent_registration():
+    if request.method == 'POST':
+        name = request.form['name']
+        email = request.form['email']
+        password = request.form['password']
+        child_name = request.form['child_name']
+        relation_to_student = request.form['relation_to_student']
+        address = request.form['address']
+        contact = request.form['contact']
+        
+        
+        exist = Parent.query.filter_by(email=email).first()
+        if exist:
+            flash("User already exists")
+            return redirect(url_for('main.home'))
+
+        # create new teacher
+        new_parent = Parent(
+            name=name,
+            email=email,
+            password=passwords.hash(password),
+            child_name=child_name,
+            relation_to_student=relation_to_student,
+            address=address,
+            contact=contact
+        )
+
+        db.session.add(new_parent)
+        db.session.commit()
+        identities.invalidate('parent', new_parent.id)
+        # flash("Registration Successful")
+        return redirect(url_for('main.login'))
+
+    return render_template("parent_register.html")
+
+
+def authenticate(model, email, password):
+    # Passwords stored in plaintext or with old hash settings are rehashed
+    # once the user has logged in with them
+    for user in model.query.filter_by(email=email):
+        matches, needs_rehash = passwords.verify(user.password, password)
+        if matches:
+            if needs_rehash:
+                user.password = passwords.hash(password)
+                db.session.commit()
+            return user
+    return None
+
+
+@bp.route('/login', methods=['GET', 'POST'])
+# Per account and IP: a school NAT puts a whole class behind one address
+@admission.rate_limit('login', key=lambda: request.form.get('email', '').strip().lower())
+def login():
+    if request.method == 'POST':
+        email = request.form['email']
+        password = request.form['password']
+
+        # check in Student table
+        student = authenticate(Student, email, password)
+        if student:
+            identity.log_in('student', student)
+            return redirect(url_for('student.student_dashboard'))
+
+        # check in Teacher table
+        teacher = authenticate(Teacher, email, password)
+        if teacher:
+            identity.log_in('teacher', teacher)
+            return redirect(url_for('teacher.teacher_dashboard'))
+
+        # check in Parent table
+        parent = authenticate(Parent, email, password)
+        if parent:
+            identity.log_in('parent', parent)
+            return redirect(url_for('parent.parent_dashboard'))
+
+        # if no match found
+        else:
+            return render_template('invalid_login.html')
+
+    return render_template('login.html')
+
+
+@bp.route('/invalid_login')
+def invalid_login():
+    return render_template('invalid_login.html')
+
+
+@bp.route('/logout')
+def logout():
+    logout_user()
+    session.clear()
+    return redirect(url_for('main.home'))
+
+
+@bp.route('/search')
+def search_page():
+    # Results are limited to the course of whoever is searching
+    user = identity.current('student') or identity.current('teacher')
+    if user is None:
+        return redirect(url_for('main.login'))
+    course_id = user.course_id
+
+    q = request.args.get('q', '').strip()
+    page = request.args.get('page', 1, type=int)
+    results, has_next = search.search(q, course_id=course_id, page=page)
+
+    return render_template('search.html', q=q, results=results, page=page,
+                           has_next=has_next, is_teacher='teacher_id' in session)
+
+
+@bp.route('/events')
+def events():
+    # Live updates for whoever is logged in: students get their own channel
+    # plus their course, parents get their children's, teachers their course
+    channels = []
+    if session.get('student_id'):
+        student = identity.current('student')
+        if student:
+            channels.append(f"student:{student.id}")
+            if student.course_id:
+                channels.append(f"course:{student.course_id}")
+    elif session.get('teacher_id'):
+        teacher = identity.current('teacher')
+        if teacher and teacher.course_id:
+            channels.append(f"course:{teacher.course_id}")
+    elif session.get('parent_id'):
+        children = Student.query.filter_by(parent_id=session['parent_id']).all()
+        channels.extend(f"student:{child.id}" for child in children)
+
+    if not channels:
+        return Response(status=204)
+
+    sub = broker.subscribe(channels)
+    if sub is None:
+        return Response("Too many live connections", status=503,
+                        headers={"Retry-After": str(broker.heartbeat)})
+
+    response = Response(broker.stream(sub), mimetype='text/event-stream',
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    # The stream's own cleanup never runs if it isn't iterated (HEAD, or a
+    # client gone before the first event); unsubscribe is safe to repeat
+    response.call_on_close(lambda: broker.unsubscribe(sub))
+    return response
@@ -0,0 +1,51 @@
+from flask import Blueprint, render_template, request, redirect, url_for, session, current_app
+
+from extensions import db
+from passwords import passwords
+import identity
+from identity import identities
+from dashboards import parent_dashboards
+from models import Parent
+
+bp = Blueprint('parent', __name__)
+
+
+@bp.route('/parent')
+def parent_index():
+    return render_template("parent_index.html")
+
+
+@bp.route('/parent_dashboard')
+def parent_dashboard():
+    parent = identity.current('parent')
+    if parent is None:
+        return redirect(url_for('main.login'))
+
+    return render_template("parent_dashboard.html", parent=parent,
+                           children=parent_dashboards.get(parent.id),
+                           absence_days=current_app.config['PARENT_DASHBOARD_ABSENCE_DAYS'])
+
+
+@bp.route('/parent_edit_profile', methods=['GET', 'POST'])
+def parent_edit_profile():
+    parent_id = session.get("parent_id")
+    if not parent_id:
+        return redirect(url_for('main.login'))
+
+    parent = Parent.query.get(parent_id)
+
+    if request.method == 'POST':
+
+        # Update text fields
+        parent.name = request.form['name']
+        parent.email = request.form['email']
+        if request.form.get('password'):
+            parent.password = passwords.hash(request.form['password'])
+        parent.Contact = request.form['contact']
+        parent.place = request.form['place']
+
+        db.session.commit()
+        identities.invalidate('parent', parent_id)
+        return redirect(url_for('parent.parent_profile'))
+
+    return render_template("parent_edit_profile.html", parent=parent)
@@ -0,0 +1,232 @@
+from flask import Blueprint, render_template, request, flash, redirect, url_for, session, Response, current_app
+from werkzeug.utils import secure_filename
+from datetime import datetime
+import os
+
+from sqlalchemy import select
+
+from extensions import db
+import read_models
+from passwords import passwords
+import identity
+from identity import identities
+from student_search import student_index as search_index
+from buffers import progress_buffer
+import watch
+from zipstream import stream_zip, unique_names
+import dashboards
+from models import Student, Teacher, Studymaterial, Progress, Recorded_class, Live_class
+
+bp = Blueprint('student', __name__)
+
+
+@bp.route('/student')
+def student_index():
+    return render_template("student_index.html")
+
+
+@bp.route('/student_dashboard')
+def student_dashboard():
+    student = identity.current('student')
+    if student is None:
+        return redirect(url_for('main.login'))
+    current_date = datetime.now().strftime('%B %d, %Y')
+    recorded_count = Recorded_class.query.filter_by(course_id=student.course_id).count() if student.course_id else 0
+    live_count = Live_class.query.filter_by(course_id=student.course_id).count() if student.course_id else 0
+    return render_template('student_dashboard.html', current_date=current_date,datetime=datetime,student =student,
+                           recorded_count=recorded_count, live_count=live_count,
+                           attendance_percent=dashboards.attendance_percent(student.id))
+
+
+@bp.route('/student_dashboard/attendance')
+def dashboard_attendance():
+    # The dashboard refetches just this when an attendance event arrives
+    student = identity.current('student')
+    if student is None:
+        return {"error": "login required"}, 401
+    return {"percent": dashboards.attendance_percent(student.id)}
+
+
+@bp.route('/student_profile')
+def student_profile():
+    student_id = session.get("student_id")
+    if not student_id:
+        return redirect(url_for('main.login'))
+    student = Student.query.get(student_id)
+    return render_template('student_profile.html', student=student)
+
+
+@bp.route('/student_edit_profile', methods=['GET', 'POST'])
+def student_edit_profile():
+    student_id = session.get("student_id")
+    if not student_id:
+        return redirect(url_for('main.login'))
+
+    student = Student.query.get(student_id)
+
+    if request.method == 'POST':
+
+        # Update text fields
+        student.name = request.form['name']
+        student.email = request.form['email']
+        if request.form.get('password'):
+            student.password = passwords.hash(request.form['password'])
+        student.age = request.form['age']
+        student.grade = request.form['grade']
+        student.parent_name = request.form['parent_name']
+        student.parent_contact = request.form['parent_contact']
+        student.course = request.form['course']
+       
+        db.session.commit()
+        identities.invalidate('student', student_id)
+        search_index.update(student_id, student.name, student.email, student.course_id)
+        return redirect(url_for('student.student_profile'))
+
+    return render_template("student_edit_profile.html", student=student)
+
+
+@bp.route('/view_material_student/<int:id>')
+def view_material_student(id):
+    student_id = session.get('student_id')
+    if not student_id:
+        return redirect(url_for('main.login'))
+
+    material = Studymaterial.query.get_or_404(id)
+
+    # mark progress (written in batches by progress_buffer)
+    progress_buffer.add((student_id, id))
+
+    # open file
+    return render_template("view_material_student.html", material=material)
+
+
+@bp.route('/student/materials.zip')
+def download_course_materials():
+    student_id = session.get('student_id')
+    if not student_id:
+        return redirect(url_for('main.login'))
+
+    student = Student.query.get_or_404(student_id)
+    materials = Studymaterial.query.join(Teacher, Studymaterial.teacher_id == Teacher.id) \
+        .filter(Teacher.course_id == student.course_id) \
+        .order_by(Studymaterial.subject, Studymaterial.id).all()
+
+    # Work out names and paths now; the archive is written after the request
+    # context is gone
+    folder = current_app.config['MATERIAL_FOLDER']
+    names = unique_names(f"{secure_filename(m.subject) or 'General'}/{m.filename}" for m in materials)
+    files = [(name, os.path.join(folder, m.filename)) for name, m in zip(names, materials)]
+
+    archive_name = secure_filename(student.course.name if student.course else "materials") + ".zip"
+    return Response(stream_zip(files), mimetype='application/zip',
+                    headers={"Content-Disposition": f"attachment; filename={archive_name}"})
+
+
+@bp.route('/student_progress')
+def student_progress():
+    student_id = session.get('student_id')  
+
+    total_materials = Studymaterial.query.count()
+    viewed_materials = Progress.query.filter_by(student_id=student_id, viewed=True).count()
+    progress_percent = (viewed_materials / total_materials) * 100 if total_materials > 0 else 0
+
+    return render_template("student_progress.html", progress=round(progress_percent))
+
+
+@bp.route('/student/view_classes')
+def student_view_classes():
+    student_id = session.get("student_id")
+    if not student_id:
+        flash("Please login first!", "danger")
+        return redirect(url_for("main.login"))
+
+    # Get student
+    student = Student.query.get_or_404(student_id)
+
+    # If student has a course assigned
+    course_id = student.course_id
+
+    # Get recorded classes for student's course
+    recorded_classes = db.session.execute(read_models.recorded_classes(course_id=course_id)).all()
+
+    # Get live classes for student's course
+    live_classes = db.session.execute(read_models.live_classes(course_id=course_id)).all()
+
+    return render_template(
+        "student_classes.html",
+        recorded_classes=recorded_classes,
+        live_classes=live_classes
+    )
+
+
+@bp.route('/student/recorded_class/<int:id>')
+def watch_recorded_class(id):
+    student_id = session.get("student_id")
+    if not student_id:
+        return redirect(url_for("main.login"))
+
+    cls = Recorded_class.query.get_or_404(id)
+    return render_template("watch_recorded_class.html", cls=cls,
+                           heartbeat=current_app.config['WATCH_HEARTBEAT_SECONDS'])
+
+
+@bp.route('/student/recorded_class/<int:id>/heartbeat', methods=['POST'])
+def recorded_class_heartbeat(id):
+    # Called by the player every few seconds while the video plays; buffered
+    # and written in batches, then rolled up by watch.rollup()
+    student = identity.current('student')
+    if student is None:
+        return Response(status=401)
+
+    data = request.get_json(silent=True) or {}
+    try:
+        position = int(float(data.get("position", 0)))
+        start = int(float(data["start"])) if data.get("start") is not None else None
+        duration = int(float(data["duration"])) if data.get("duration") else None
+    except (TypeError, ValueError, OverflowError):
+        return Response(status=400)
+
+    # Only classes of the student's own course count
+    course_id = db.session.scalar(select(Recorded_class.course_id).where(Recorded_class.id == id))
+    if course_id is None:
+        return Response(status=404)
+    if course_id != student.course_id:
+        return Response(status=403)
+
+    watch.record_heartbeat(student.id, id, position, duration, start)
+    return Response(status=204)
+
+
+@bp.route('/student/attendance')
+def view_attendance():
+    student_id = session.get('student_id')
+    if not student_id:
+        return redirect(url_for('main.login'))
+
+
+    # Includes rows moved to the attendance archive
+    records = db.session.execute(read_models.attendance(student_id)).all()
+
+    if not records:
+        return render_template('student_attendance.html', records=[], percentage=0)
+
+    # Prepare data for template
+    attendance_list = []
+    present_count = 0
+
+    for record in records:
+        attendance_list.append({
+            "date": record.date.strftime("%d-%m-%Y"),
+            "status": record.status
+        })
+        if record.status.lower() == "present":
+            present_count += 1
+
+    total_days = len(records)
+    attendance_percentage = (present_count / total_days) * 100
+
+    return render_template(
+        'student_attendance.html',
+        records=attendance_list,
+        percentage=attendance_percentage
+    )
@@ -0,0 +1,521 @@
+from flask import Blueprint, render_template, request, flash, redirect, url_for, session, abort, current_app
+from werkzeug.utils import secure_filename
+from datetime import datetime, date
+import os
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+
+from extensions import db
+import read_models
+from passwords import passwords
+import identity
+from identity import identities
+from events import broker
+from extraction import extractor
+import storage
+import engagement
+import scheduling
+from admission import admission
+from streaming import iter_rows, stream_page
+from dashboards import parent_dashboards
+from models import (Student, Teacher, Course, Attendance, Studymaterial, Recorded_class, Live_class,
+                    Video_engagement, Watch_summary)
+
+bp = Blueprint('teacher', __name__)
+
+# Allowed video extensions
+ALLOWED_EXTENSIONS = {'mp4', 'mkv', 'webm'}
+ALLOWED_MATERIALS = {'pdf', 'docx', 'pptx', 'ppt', 'zip', 'txt', 'jpg', 'jpeg', 'png'}
+
+
+@bp.route('/teacher')
+def teacher_index():
+    return render_template("teacher_index.html")
+
+
+@bp.route('/teacher_dashboard')
+def teacher_dashboard():
+    teacher = identity.current('teacher')
+    if teacher is None:
+        return redirect(url_for('main.login'))
+    current_date = datetime.now().strftime('%B %d, %Y')
+    return render_template('teacher_dashboard.html', current_date=current_date,datetime=datetime,teacher =teacher)
+
+
+@bp.route('/teacher_profile')
+def teacher_profile():
+    teacher_id = session.get("teacher_id")
+    if not teacher_id:
+        return redirect(url_for('main.login'))
+    teacher = Teacher.query.get(teacher_id)
+    return render_template('teacher_profile.html', teacher=teacher)
+
+
+@bp.route('/teacher_edit_profile', methods=['GET', 'POST'])
+def teacher_edit_profile():
+    teacher_id = session.get("teacher_id")
+    if not teacher_id:
+        return redirect(url_for('main.login'))
+
+    teacher = Teacher.query.get(teacher_id)
+
+    if request.method == 'POST':
+        
+        # Handle Photo Upload
+        photo_file = request.files.get('photo')
+        if photo_file and photo_file.filename != "":
+            filename = secure_filename(photo_file.filename)
+            photo_file.save(os.path.join("static/photos", filename))
+            teacher.photo = filename
+
+        # Update Text Fields
+        teacher.name = request.form['name']
+        teacher.email = request.form['email']
+        if request.form.get('password'):
+            teacher.password = passwords.hash(request.form['password'])
+        teacher.qualifications = request.form['qualifications']
+        teacher.subject = request.form['subject']
+        teacher.availability = request.form['availability']
+        teacher.years_of_experience = request.form['years_of_experience']
+        teacher.contact = request.form['contact']
+        teacher.place = request.form['place']
+
+        db.session.commit()
+        identities.invalidate('teacher', teacher_id)
+        return redirect(url_for('teacher.teacher_profile'))
+
+    return render_template("teacher_edit_profile.html", teacher=teacher)
+
+
+@bp.route('/teacher/attendance', methods=['GET', 'POST'])
+def mark_attendance():
+    teacher_id = session.get('teacher_id')
+
+    if not teacher_id:
+        return redirect(url_for('main.login'))
+
+    formatted_date = date.today().strftime("%d-%m-%Y")
+
+    if request.method == 'POST':
+        submitted = {}
+        for key, status in request.form.items():
+            name, _, student_id = key.partition('_')
+            if name == 'status' and student_id.isdigit() and status:
+                submitted[int(student_id)] = status
+        known = set(db.session.scalars(select(Student.id).where(Student.id.in_(submitted)))) if submitted else set()
+        marked = [(student_id, status) for student_id, status in submitted.items() if student_id in known]
+
+        if marked:
+            # One row per student per day: resubmitting the form, or marking a
+            # student a scanner already checked in, updates the day's status
+            stmt = insert(Attendance)
+            db.session.execute(stmt.on_conflict_do_update(
+                index_elements=['student_id', 'date'],
+                set_={'status': stmt.excluded.status, 'teacher_id': stmt.excluded.teacher_id}),
+                [{'student_id': student_id, 'teacher_id': teacher_id, 'status': status, 'date': date.today()}
+                 for student_id, status in marked])
+        db.session.commit()
+        parent_dashboards.invalidate_students(student_id for student_id, _ in marked)
+        for student_id, status in marked:
+            broker.publish(f"student:{student_id}", "attendance",
+                           {"date": date.today(), "status": status})
+
+    # Streamed so a big roster starts showing straight away
+    students = iter_rows(db.session, read_models.roster())
+    return stream_page('attendence.html', students=students, today=formatted_date,
+                       success=request.method == 'POST')
+
+
+@bp.route('/manage_class')
+def manage_class():
+    # You can fetch recorded and live classes from DB
+    recorded_classes = db.session.execute(read_models.recorded_classes(teacher_id=session['teacher_id'])).all()
+    live_classes = db.session.execute(read_models.live_classes(teacher_id=session['teacher_id'])).all()
+    return render_template('manage_class.html', 
+                           recorded_classes=recorded_classes,
+                           live_classes=live_classes)
+
+
+def allowed_file(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+
+def upload_quota_error(teacher):
+    # Checked against Content-Length before request.form/files read the body
+    if request.content_length is None:
+        return "Upload size is unknown, please try again."
+    return storage.check_quota(teacher.id, teacher.course_id, request.content_length)
+
+
+@bp.route('/teacher/upload_recorded_class', methods=['GET', 'POST'])
+@admission.rate_limit('upload')
+@admission.limit('upload', methods=('POST',))
+def upload_recorded_class():
+    teacher_id = session.get("teacher_id")
+    if not teacher_id:
+        flash("Login required!", "danger")
+        return redirect(url_for("main.login"))
+
+    teacher = Teacher.query.get_or_404(teacher_id)
+    
+    # Teacher's courses (wrap in list if single)
+    courses = [teacher.course] if teacher.course else []  
+    if request.method == 'GET':
+        return render_template("upload_recorded_class.html", courses=courses)
+
+    # POST
+    quota_error = upload_quota_error(teacher)
+    if quota_error:
+        flash(quota_error, "danger")
+        return redirect(url_for("teacher.upload_recorded_class"))
+
+    title = request.form.get("title")
+    date_str = request.form.get("date")
+    video = request.files.get("video")
+    course_id = request.form.get("course_id")
+
+    if not course_id:
+        flash("Please select a course!", "danger")
+        return redirect(url_for("teacher.upload_recorded_class"))
+
+    try:
+        course_id = int(course_id)
+        date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
+    except ValueError:
+        flash("Invalid course or date format!", "danger")
+        return redirect(url_for("teacher.upload_recorded_class"))
+
+    if not video or video.filename == "":
+        flash("Please upload a video!", "danger")
+        return redirect(url_for("teacher.upload_recorded_class"))
+
+    filename = secure_filename(video.filename)
+    save_path = os.path.join(current_app.config['UPLOAD_FOLDER_VIDEOS'], filename)
+    # Saving over another recording would replace its video and count the
+    # new size without releasing the old one
+    if not filename or os.path.exists(save_path):
+        flash("A video with that file name already exists, please rename it and try again.", "danger")
+        return redirect(url_for("teacher.upload_recorded_class"))
+    video.save(save_path)
+    size = os.path.getsize(save_path)
+
+    # Save to database
+    new_recorded = Recorded_class(
+        teacher_id=teacher_id,
+        course_id=course_id,
+        title=title,
+        date=date_obj,
+        filename=filename,
+        size=size
+    )
+    db.session.add(new_recorded)
+    storage.record_usage(teacher_id, course_id, size)
+    db.session.commit()
+
+    flash("Recorded class uploaded successfully!", "success")
+    return redirect(url_for("teacher.manage_class"))
+
+
+def publish_live_class(cls, event):
+    broker.publish(f"course:{cls.course_id}", event, {
+        "id": cls.id,
+        "title": cls.title,
+        "date": cls.date,
+        "time": cls.time.strftime("%H:%M"),
+        "platform": cls.platform,
+        "duration": cls.duration,
+    })
+
+
+def live_class_duration():
+    # Minutes from the form, or None if missing or out of range
+    duration = request.form.get("duration", current_app.config['LIVE_CLASS_DEFAULT_DURATION'], type=int)
+    if duration is None or not 0 < duration <= current_app.config['LIVE_CLASS_MAX_DURATION']:
+        return None
+    return duration
+
+
+def live_class_clash(teacher_id, course_id, start, duration, exclude_id=None):
+    """A message naming the class this one would overlap, with the next
+    free slot, or None if the time is free for the teacher and the course."""
+    clashes = scheduling.conflicts(teacher_id, course_id, start, duration, exclude_id)
+    if not clashes:
+        return None
+    clash = clashes[0]
+    owner = "You already teach" if clash.teacher_id == teacher_id else "This course already has"
+    message = f'{owner} "{clash.title}" on {clash.date} at {clash.time.strftime("%H:%M")} ({clash.duration} min).'
+    slot = scheduling.next_free_slot(teacher_id, course_id, duration, start, exclude_id)
+    if slot:
+        message += f" The next free slot is {slot.strftime('%Y-%m-%d %H:%M')}."
+    return message
+
+
+@bp.route('/teacher/upload_live_class', methods=['GET', 'POST'])
+def upload_live_class():
+    teacher_id = session.get("teacher_id")
+    if not teacher_id:
+        flash("Login required!", "danger")
+        return redirect(url_for("main.login"))
+
+    teacher = Teacher.query.get_or_404(teacher_id)
+    
+    # Teacher's courses
+    courses = [teacher.course] if teacher.course else []
+    if request.method == 'GET':
+        return render_template("add_live_class.html", courses=courses,
+                               default_duration=current_app.config['LIVE_CLASS_DEFAULT_DURATION'])
+
+    # POST
+    title = request.form.get("title")
+    date_str = request.form.get("date")
+    time_str = request.form.get("time")
+    platform = request.form.get("platform")
+    link = request.form.get("link")
+    course_id = request.form.get("course_id")
+
+    if not course_id:
+        flash("Please select a course!", "danger")
+        return redirect(url_for("teacher.upload_live_class"))
+
+    try:
+        course_id = int(course_id)
+        date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
+        time_obj = datetime.strptime(time_str, "%H:%M").time()
+    except ValueError:
+        flash("Invalid date or time format!", "danger")
+        return redirect(url_for("teacher.upload_live_class"))
+
+    duration = live_class_duration()
+    if duration is None:
+        flash(f"Duration must be between 1 and {current_app.config['LIVE_CLASS_MAX_DURATION']} minutes!", "danger")
+        return redirect(url_for("teacher.upload_live_class"))
+
+    scheduling.lock_calendar()
+    clash = live_class_clash(teacher_id, course_id, datetime.combine(date_obj, time_obj), duration)
+    if clash:
+        db.session.rollback()
+        flash(clash, "danger")
+        return redirect(url_for("teacher.upload_live_class"))
+
+    new_class = Live_class(
+        teacher_id=teacher_id,
+        course_id=course_id,
+        title=title,
+        date=date_obj,
+        time=time_obj,
+        platform=platform,
+        link=link,
+        duration=duration
+    )
+    db.session.add(new_class)
+    db.session.commit()
+    publish_live_class(new_class, "live_class")
+
+    flash("Live class scheduled successfully!", "success")
+    return redirect(url_for("teacher.manage_class"))
+
+
+@bp.route('/teacher/delete_recorded_class/<int:id>', methods=['GET'])
+def delete_recorded_class(id):
+    cls = Recorded_class.query.get_or_404(id)
+    # Delete video file from storage
+    file_path = os.path.join(current_app.config['UPLOAD_FOLDER_VIDEOS'], cls.filename)
+    if os.path.exists(file_path):
+        os.remove(file_path)
+
+    storage.release_usage(cls.teacher_id, cls.course_id, cls.size)
+    db.session.delete(cls)
+    db.session.commit()
+
+    return redirect(url_for('teacher.manage_class'))
+
+
+@bp.route('/edit_recorded_class/<int:id>', methods=['GET', 'POST'])
+def edit_recorded_class(id):
+    cls = Recorded_class.query.get_or_404(id)
+
+    if request.method == 'POST':
+        cls.title = request.form['title']
+        cls.date = datetime.strptime(request.form['date'], "%Y-%m-%d").date()
+        # The filename isn't editable: pointing the row at another file would
+        # orphan this one and skip the storage usage bookkeeping
+
+        db.session.commit()
+        return redirect(url_for('teacher.manage_class'))
+
+    return render_template('edit_recorded_cls.html', cls=cls)
+
+
+@bp.route('/edit_live-class/<int:id>', methods=['GET', 'POST'])
+def edit_live_class(id):
+    cls = Live_class.query.get_or_404(id)
+
+    if request.method == 'POST':
+        date_obj = datetime.strptime(request.form['date'], "%Y-%m-%d").date()
+
+        time_str = request.form['time']
+        if len(time_str) == 5:
+            time_obj = datetime.strptime(time_str, "%H:%M").time()
+        else:
+            time_obj = datetime.strptime(time_str, "%H:%M:%S").time()
+
+        duration = live_class_duration()
+        if duration is None:
+            flash(f"Duration must be between 1 and {current_app.config['LIVE_CLASS_MAX_DURATION']} minutes!", "danger")
+            return redirect(url_for('teacher.edit_live_class', id=id))
+
+        # Checked before touching cls so the query doesn't flush the edit
+        scheduling.lock_calendar()
+        clash = live_class_clash(cls.teacher_id, cls.course_id, datetime.combine(date_obj, time_obj), duration,
+                                 exclude_id=cls.id)
+        if clash:
+            db.session.rollback()
+            flash(clash, "danger")
+            return redirect(url_for('teacher.edit_live_class', id=id))
+
+        cls.title = request.form['title']
+        cls.date = date_obj
+        cls.time = time_obj
+        cls.duration = duration
+        cls.platform = request.form['platform']
+        cls.link = request.form['link']
+
+        db.session.commit()
+        publish_live_class(cls, "live_class_updated")
+        return redirect(url_for('teacher.manage_class'))
+
+    return render_template('edit_live_cls.html', cls=cls)
+
+
+@bp.route('/delete_live_class/<int:id>',methods =['GET'])
+def delete_live_class(id):
+    cls = Live_class.query.get_or_404(id)
+    db.session.delete(cls)
+    db.session.commit()
+    return redirect(url_for('teacher.manage_class'))
+
+
+def allowed_material(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_MATERIALS
+
+
+@bp.route('/upload_material', methods=['GET', 'POST'])
+@admission.rate_limit('upload')
+@admission.limit('upload', methods=('POST',))
+def upload_material():
+
+    teacher_id = session.get('teacher_id')
+    if not teacher_id:
+        return redirect(url_for('main.login'))
+
+    if request.method == 'POST':
+        teacher = Teacher.query.get_or_404(teacher_id)
+        quota_error = upload_quota_error(teacher)
+        if quota_error:
+            flash(quota_error, "danger")
+            return redirect(url_for('teacher.upload_material'))
+
+        subject = request.form['subject']
+        title = request.form['title']
+        description = request.form['description']
+        file = request.files['file']
+
+        if file and allowed_material(file.filename):
+            filename = secure_filename(file.filename)
+
+            filepath = os.path.join(current_app.config['MATERIAL_FOLDER'], filename)
+            file.save(filepath)
+            size = os.path.getsize(filepath)
+
+            material = Studymaterial(
+                subject=subject, 
+                teacher_id=teacher_id,    
+                title=title,
+                description=description,
+                filename=filename,
+                upload_date=date.today(),
+                size=size
+            )
+
+            db.session.add(material)
+            storage.record_usage(teacher_id, teacher.course_id, size)
+            db.session.commit()
+
+            # Index the file contents in the background
+            extractor.submit(material.id, filepath)
+
+            return redirect(url_for('teacher.manage_materials'))
+    subjects = Course.query.filter_by(teacher_id=teacher_id).all()
+    return render_template("upload_materials.html", subjects=subjects)
+
+
+@bp.route('/manage_materials')
+def manage_materials():
+    teacher_id = session.get('teacher_id')
+    materials = db.session.execute(read_models.materials(teacher_id)).all()
+    return render_template('manage_materials.html', materials=materials)
+
+
+@bp.route('/teacher/materials/analytics')
+def material_analytics():
+    teacher = identity.current('teacher')
+    if teacher is None:
+        return redirect(url_for("main.login"))
+
+    teacher_id = teacher.id
+    enrolled = Student.query.filter_by(course_id=teacher.course_id).count() if teacher.course_id else 0
+    missing = engagement.not_viewed(teacher_id, teacher.course_id,
+                                    current_app.config['MATERIAL_ANALYTICS_NOT_VIEWED']) if teacher.course_id else {}
+    return render_template("material_analytics.html", materials=engagement.teacher_materials(teacher_id),
+                           enrolled=enrolled, missing=missing)
+
+
+@bp.route('/edit_material/<int:id>', methods=['GET', 'POST'])
+def edit_material(id):
+    material = Studymaterial.query.get_or_404(id)
+
+    if request.method == 'POST':
+        material.title = request.form['title']
+        material.description = request.form['description']
+        db.session.commit()
+        return redirect(url_for('teacher.manage_materials'))
+
+    return render_template("edit_material.html", material=material)
+
+
+@bp.route('/delete_material/<int:id>')
+def delete_material(id):
+    material = Studymaterial.query.get_or_404(id)
+    filename = material.filename
+    storage.release_usage(material.teacher_id, material.teacher.course_id if material.teacher else None,
+                          material.size)
+    db.session.delete(material)
+    db.session.commit()
+
+    # Remove the file unless another material still uses it
+    if not Studymaterial.query.filter_by(filename=filename).first():
+        file_path = os.path.join(current_app.config['MATERIAL_FOLDER'], filename)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+    return redirect(url_for('teacher.manage_materials'))
+
+
+@bp.route('/teacher/recorded_class/<int:id>/engagement')
+def recorded_class_engagement(id):
+    teacher_id = session.get("teacher_id")
+    if not teacher_id:
+        return redirect(url_for("main.login"))
+
+    cls = Recorded_class.query.get_or_404(id)
+    if cls.teacher_id != teacher_id:
+        abort(403)
+
+    summary = Video_engagement.query.get(id)
+    viewers = Watch_summary.query.options(db.joinedload(Watch_summary.student)) \
+        .filter_by(recorded_class_id=id) \
+        .order_by(Watch_summary.percent.desc()).all()
+
+    return render_template("recorded_engagement.html", cls=cls,
+                           summary=summary, viewers=viewers)
@@ -0,0 +1,159 @@
+from datetime import datetime
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import case, func, insert, tuple_
+
+from buffers import WriteBehindBuffer
+from extensions import db
+from jobs import scheduler
+from models import Watch_event, Watch_summary, Video_engagement, Job_state
+
+ROLLUP_CURSOR = 'watch_rollup'
+MAX_POSITION = 24 * 60 * 60  # ignore positions past a day into a video
+
+
+def flush_watch_events(items):
+    db.session.execute(insert(Watch_event), items)
+    db.session.commit()
+
+
+watch_buffer = WriteBehindBuffer('watch_buffer', flush_watch_events)
+
+
+def record_heartbeat(student_id, recorded_class_id, position, duration=None, start=None):
+    """Buffer one beat: the player is at `position` and has played from
+    `start` since its last beat."""
+    duration = duration if duration and 0 < duration <= MAX_POSITION else None
+    # Past the end of the video would mark buckets that don't exist
+    position = max(0, min(position, duration - 1 if duration else MAX_POSITION))
+    watch_buffer.add({
+        "student_id": student_id,
+        "recorded_class_id": recorded_class_id,
+        "position": position,
+        "start": max(0, min(start, position)) if start is not None else None,
+        "duration": duration,
+        "created_at": datetime.now(),
+    })
+
+
+def _played(event, previous_at, heartbeat_seconds, max_rate):
+    # Seconds of video credited to a beat: from its start to its position,
+    # but no more than could have played since the previous beat
+    if event.start is None:
+        return event.position, event.position
+    elapsed = (event.created_at - previous_at).total_seconds() if previous_at else heartbeat_seconds
+    return max(event.start, event.position - int(max(elapsed, 0) * max_rate)), event.position
+
+
+def rollup(bucket_seconds, complete_percent, heartbeat_seconds=10, max_rate=2.0, batch_size=2000):
+    """Fold new Watch_event rows into Watch_summary and Video_engagement.
+
+    Each summary keeps a bitmap of the WATCH_BUCKET_SECONDS slots a student
+    has watched, so rewatching a part doesn't count twice and processing
+    the same events again is harmless. A beat marks every slot from where
+    it says playback started to its position, capped at max_rate times the
+    time since the student's previous beat.
+    """
+    processed = 0
+    while True:
+        state = db.session.get(Job_state, ROLLUP_CURSOR)
+        cursor = int(state.value) if state else 0
+
+        events = db.session.query(Watch_event) \
+            .filter(Watch_event.id > cursor) \
+            .order_by(Watch_event.id).limit(batch_size).all()
+        if not events:
+            break
+
+        pairs = {(e.student_id, e.recorded_class_id) for e in events}
+        summaries = {
+            (s.student_id, s.recorded_class_id): s
+            for s in Watch_summary.query.filter(
+                tuple_(Watch_summary.student_id, Watch_summary.recorded_class_id).in_(pairs))
+        }
+
+        bitmaps = {}
+        for e in events:
+            key = (e.student_id, e.recorded_class_id)
+            summary = summaries.get(key)
+            if summary is None:
+                summary = Watch_summary(student_id=e.student_id, recorded_class_id=e.recorded_class_id,
+                                        buckets=b'', watched_seconds=0, percent=0)
+                summaries[key] = summary
+                db.session.add(summary)
+            bits = bitmaps.setdefault(key, bytearray(summary.buckets))
+
+            start, end = _played(e, summary.last_watched_at, heartbeat_seconds, max_rate)
+            last = end // bucket_seconds
+            if last // 8 >= len(bits):
+                bits.extend(b'\0' * (last // 8 + 1 - len(bits)))
+            for slot in range(start // bucket_seconds, last + 1):
+                bits[slot // 8] |= 1 << (slot % 8)
+
+            if e.duration:
+                summary.duration = max(summary.duration or 0, e.duration)
+            summary.last_watched_at = max(summary.last_watched_at or e.created_at, e.created_at)
+
+        for key, bits in bitmaps.items():
+            summary = summaries[key]
+            summary.buckets = bytes(bits)
+            summary.watched_seconds = int.from_bytes(bits, 'little').bit_count() * bucket_seconds
+            if summary.duration:
+                summary.percent = min(100.0, summary.watched_seconds * 100.0 / summary.duration)
+        db.session.flush()
+
+        refresh_engagement({class_id for _, class_id in pairs}, complete_percent)
+
+        if state is None:
+            state = Job_state(name=ROLLUP_CURSOR)
+            db.session.add(state)
+        state.value = str(events[-1].id)
+        state.updated_at = datetime.now()
+        db.session.commit()
+
+        processed += len(events)
+        if len(events) < batch_size:
+            break
+    return processed
+
+
+def refresh_engagement(class_ids, complete_percent):
+    now = datetime.now()
+    rows = db.session.query(
+        Watch_summary.recorded_class_id,
+        func.count(),
+        func.sum(case((Watch_summary.percent >= complete_percent, 1), else_=0)),
+        func.avg(Watch_summary.percent),
+    ).filter(Watch_summary.recorded_class_id.in_(class_ids)) \
+     .group_by(Watch_summary.recorded_class_id).all()
+
+    for class_id, viewers, completed, avg_percent in rows:
+        db.session.merge(Video_engagement(recorded_class_id=class_id, viewers=viewers,
+                                          completed=completed, avg_percent=avg_percent,
+                                          updated_at=now))
+
+
+def run_rollup():
+    config = current_app.config
+    return rollup(config['WATCH_BUCKET_SECONDS'], config['WATCH_COMPLETE_PERCENT'],
+                  config['WATCH_HEARTBEAT_SECONDS'], config['WATCH_MAX_RATE'])
+
+
+@click.command("watch-rollup")
+@with_appcontext
+def rollup_command():
+    """Roll recorded class watch events up into summaries."""
+    click.echo(f"Rolled up {run_rollup()} watch events.")
+
+
+def init_app(app):
+    app.config.setdefault('WATCH_HEARTBEAT_SECONDS', 10)
+    app.config.setdefault('WATCH_BUCKET_SECONDS', 10)
+    app.config.setdefault('WATCH_COMPLETE_PERCENT', 90)
+    app.config.setdefault('WATCH_MAX_RATE', 2.0)
+    app.config.setdefault('WATCH_ROLLUP_INTERVAL', 60)
+    watch_buffer.init_app(app, 'WATCH_FLUSH_INTERVAL', 'WATCH_FLUSH_SIZE')
+    scheduler.add('watch-rollup', app.config['WATCH_ROLLUP_INTERVAL'], run_rollup)
+    app.cli.add_command(rollup_command)
@@ -0,0 +1,80 @@
+import os
+import time
+import zipfile
+
+# Formats that are already compressed; deflating them again only costs CPU
+STORED_EXTENSIONS = {'pdf', 'jpg', 'jpeg', 'png', 'zip', 'docx', 'pptx', 'mp4', 'mkv', 'webm'}
+
+CHUNK_SIZE = 64 * 1024
+
+
+class _Sink:
+    # Write-only file object that zipfile writes into and stream_zip drains.
+    # It has no seek(), so zipfile writes data descriptors after each entry
+    # instead of going back to patch the local headers.
+
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+        self.pending = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        self.pending += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        self.pending = 0
+        return data
+
+
+def stream_zip(files, chunk_size=CHUNK_SIZE):
+    """Yield a ZIP archive of (arcname, path) pairs piece by piece.
+
+    Entries are written as the files are read, so memory use stays at about
+    chunk_size no matter how big the archive gets. Missing files are skipped.
+    """
+    sink = _Sink()
+    with zipfile.ZipFile(sink, 'w') as archive:
+        for arcname, path in files:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+
+            info = zipfile.ZipInfo(arcname, time.localtime(st.st_mtime)[:6])
+            ext = arcname.rsplit('.', 1)[-1].lower()
+            info.compress_type = zipfile.ZIP_STORED if ext in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+            info.file_size = st.st_size  # lets zipfile pick ZIP64 headers for big files
+
+            with open(path, 'rb') as src, archive.open(info, 'w') as dest:
+                while True:
+                    chunk = src.read(chunk_size)
+                    if not chunk:
+                        break
+                    dest.write(chunk)
+                    if sink.pending >= chunk_size:
+                        yield sink.drain()
+            yield sink.drain()
+    yield sink.drain()
+
+
+def unique_names(names):
+    # "notes.pdf", "notes.pdf" -> "notes.pdf", "notes (2).pdf"
+    seen = {}
+    for name in names:
+        count = seen.get(name.lower(), 0) + 1
+        seen[name.lower()] = count
+        if count > 1:
+            stem, dot, ext = name.rpartition('.')
+            name = f"{stem} ({count}).{ext}" if dot else f"{name} ({count})"
+        yield name